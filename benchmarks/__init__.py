@@ -0,0 +1 @@
+"""Offline benchmarks for the EmmeTI Febos integration."""
@@ -0,0 +1,137 @@
+"""Benchmark EmmeTI Febos discovery, updates and entity enumeration offline.
+
+Requires Home Assistant and the febos library to be importable. Run from the
+repository root:
+
+    python -m benchmarks.bench_febos --installations 4 --devices 2 --registers 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import gc
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.const import Platform
+
+from custom_components.febos import binary_sensor, sensor
+from custom_components.febos.buffer import FebosSampleBuffer
+from custom_components.febos.client import FebosClient
+from custom_components.febos.poller import FebosPoller
+
+from .fake_febos import FakeFebosApi
+
+
+class BenchCoordinator(SimpleNamespace):
+    """Expose a poller the way the platforms expect the coordinator to."""
+
+    def get_sensors(self):
+        """List all EmmeTI Febos sensors."""
+        return self.index.populated(Platform.SENSOR, self.values)
+
+    def get_binary_sensors(self):
+        """List all EmmeTI Febos binary sensors."""
+        return self.index.populated(Platform.BINARY_SENSOR, self.values)
+
+    def async_add_entity_callback(self, platform, add_entities):
+        """Add the entities of a platform."""
+        add_entities(list(self.index.populated(platform, self.values)))
+
+    def async_add_derived_callback(self, add_entities):
+        """Add the derived metric entities."""
+        add_entities(FebosSampleBuffer(self.index).entries)
+
+
+async def measure(
+    name: str, func: Callable[[], Awaitable[Any]], iterations: int
+) -> None:
+    """Print wall time, allocated blocks and peak memory of a coroutine."""
+    timings = []
+    blocks = 0
+    peak = 0
+    for _ in range(iterations):
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+        after = tracemalloc.take_snapshot()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        blocks = max(
+            blocks,
+            sum(
+                stat.count_diff
+                for stat in after.compare_to(before, "filename")
+                if stat.count_diff > 0
+            ),
+        )
+    timings.sort()
+    print(
+        f"{name:<12} min {timings[0] * 1000:9.2f} ms  "
+        f"median {timings[len(timings) // 2] * 1000:9.2f} ms  "
+        f"allocations {blocks:9d}  peak {peak / 1024:10.1f} KiB"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the benchmarks."""
+    api = FakeFebosApi(
+        installations=args.installations,
+        devices=args.devices,
+        registers=args.registers,
+        slaves=args.slaves,
+    )
+    client = FebosClient(api)
+    await client.async_login()
+    poller = FebosPoller(client, slow_groups=[])
+
+    async def discovery() -> None:
+        poller.set_topology(await poller.async_fetch_topology())
+
+    async def update() -> None:
+        await poller.async_update()
+
+    entry = SimpleNamespace(
+        runtime_data=BenchCoordinator(
+            client=client,
+            config_entry=SimpleNamespace(entry_id="bench", title="Bench"),
+            index=None,
+            values=poller.values,
+        )
+    )
+
+    async def entities() -> None:
+        entry.runtime_data.index = poller.index
+        added = []
+        await sensor.async_setup_entry(None, entry, added.extend)
+        await binary_sensor.async_setup_entry(None, entry, added.extend)
+
+    print(
+        f"{args.installations} installations x {args.devices} devices x "
+        f"{args.registers} registers, {args.slaves} slaves per device"
+    )
+    await measure("discovery", discovery, args.iterations)
+    await measure("update", update, args.iterations)
+    await measure("entities", entities, args.iterations)
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--installations", type=int, default=1)
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--registers", type=int, default=50)
+    parser.add_argument("--slaves", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
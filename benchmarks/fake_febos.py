@@ -0,0 +1,168 @@
+"""Synthetic stand-in for the EmmeTI Febos webapp API."""
+
+from __future__ import annotations
+
+import random
+from typing import Any
+
+SCALED_CODES = ["R8702", "R8703", "R8678", "R8680", "R8684", "R8686", "R8220"]
+BOOL_CODES = ["R16384", "R8681", "R8683", "R9089", "R8672", "R8673"]
+MEAS_UNITS = ["°C", "kW", "h", "watt/h", "%", "L/h", ""]
+
+
+class FakeFebosApi:
+    """Generate Febos payloads for N installations x M devices x K registers."""
+
+    def __init__(
+        self,
+        installations: int = 1,
+        devices: int = 1,
+        registers: int = 50,
+        slaves: int = 4,
+        registers_per_group: int = 10,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the fake API."""
+        self.installations = installations
+        self.devices = devices
+        self.registers = registers
+        self.slaves = slaves
+        self.registers_per_group = registers_per_group
+        self.random = random.Random(seed)
+        self.login_data: dict[str, Any] = {}
+
+    @staticmethod
+    def installation_id(installation: int) -> int:
+        """Return the id of an installation."""
+        return 1000 + installation
+
+    @staticmethod
+    def device_id(installation_id: int, device: int) -> int:
+        """Return the id of a device."""
+        return installation_id * 100 + device
+
+    @staticmethod
+    def thing_id(device_id: int) -> int:
+        """Return the id of the thing of a device."""
+        return device_id * 10
+
+    def codes(self) -> list[str]:
+        """Return the register codes of every thing."""
+        known = SCALED_CODES + BOOL_CODES
+        return known[: self.registers] + [
+            f"R{20000 + n}" for n in range(self.registers - len(known))
+        ]
+
+    def login(self) -> None:
+        """Log in."""
+        self.login_data = {
+            "installationIdList": [
+                self.installation_id(n) for n in range(self.installations)
+            ]
+        }
+
+    def _input(self, code: str, device_id: int, n: int) -> dict[str, Any]:
+        """Return the description of a register."""
+        if code in BOOL_CODES:
+            return {
+                "code": code,
+                "deviceId": device_id,
+                "thingId": self.thing_id(device_id),
+                "label": f"Input {code}",
+                "inputType": "BOOL",
+            }
+        return {
+            "code": code,
+            "deviceId": device_id,
+            "thingId": self.thing_id(device_id),
+            "label": f"Input {code}",
+            "inputType": "INT",
+            "measUnit": MEAS_UNITS[n % len(MEAS_UNITS)],
+        }
+
+    def page_config(self, installation_id: int) -> dict[str, Any]:
+        """Return the page configuration of an installation."""
+        device_ids = [self.device_id(installation_id, n) for n in range(self.devices)]
+        codes = self.codes()
+        groups = []
+        for device_id in device_ids:
+            for start in range(0, len(codes), self.registers_per_group):
+                group_codes = codes[start : start + self.registers_per_group]
+                groups.append(
+                    {
+                        "inputGroupGetCode": f"GRP-{start}@{device_id}",
+                        "deviceId": device_id,
+                        "thingId": self.thing_id(device_id),
+                        "inputList": [
+                            self._input(code, device_id, start + n)
+                            for n, code in enumerate(group_codes)
+                        ],
+                    }
+                )
+        return {
+            "deviceMap": {
+                str(device_id): {
+                    "id": device_id,
+                    "installationId": installation_id,
+                    "tenantName": "EmmeTI",
+                    "modelName": "Febos",
+                    "deviceTypeName": "CONTROLLER",
+                }
+                for device_id in device_ids
+            },
+            "thingMap": {
+                str(self.thing_id(device_id)): {
+                    "id": self.thing_id(device_id),
+                    "deviceId": device_id,
+                    "modelName": f"Thing {device_id}",
+                }
+                for device_id in device_ids
+            },
+            "pageMap": {
+                "1": {"tabList": [{"widgetList": [{"widgetInputGroupList": groups}]}]}
+            },
+        }
+
+    def realtime_data(
+        self, installation_id: int, groups: set[str]
+    ) -> list[dict[str, Any]]:
+        """Return jittering values for the requested input groups."""
+        codes = self.codes()
+        response = []
+        for n in range(self.devices):
+            device_id = self.device_id(installation_id, n)
+            data = {}
+            for start in range(0, len(codes), self.registers_per_group):
+                if f"GRP-{start}@{device_id}" not in groups:
+                    continue
+                for code in codes[start : start + self.registers_per_group]:
+                    if code in BOOL_CODES:
+                        data[code] = {"i": self.random.randint(0, 1)}
+                    else:
+                        data[code] = {"i": 200 + self.random.randint(-2, 2)}
+            response.append(
+                {
+                    "deviceId": device_id,
+                    "thingId": self.thing_id(device_id),
+                    "data": data,
+                }
+            )
+        return response
+
+    def get_febos_slave(
+        self, installation_id: int, device_id: int
+    ) -> list[dict[str, Any]]:
+        """Return jittering values for the slaves of a device."""
+        return [
+            {
+                "indirizzoSlave": address,
+                "callTemp": self.random.randint(0, 1),
+                "callHumid": 0,
+                "stagione": 1,
+                "setTemp": 200,
+                "temp": 200 + self.random.randint(-2, 2),
+                "humid": 50 + self.random.randint(-1, 1),
+                "confort": 1,
+            }
+            for address in range(1, self.slaves + 1)
+        ]
@@ -0,0 +1,89 @@
+"""Replay recorded EmmeTI Febos API traffic through the update pipeline.
+
+Requires Home Assistant and the febos library to be importable. Record the
+traffic by enabling "Record API traffic" in the integration options, copy the
+files from the febos folder of the configuration directory, then run from the
+repository root:
+
+    python -m benchmarks.replay_febos config/febos/<entry_id>.jsonl.gz --speed 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import time
+
+from custom_components.febos.client import FebosClient
+from custom_components.febos.poller import FebosPoller
+from custom_components.febos.publisher import FebosPublisher
+from custom_components.febos.recording import (
+    FebosReplayApi,
+    read_records,
+    recording_files,
+)
+
+PARSE_ENDPOINTS = ["parse_topology", "parse_realtime_data", "parse_get_febos_slave"]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Replay the recording."""
+    paths = [file for path in args.recording for file in recording_files(path)]
+    api = FebosReplayApi(read_records(paths))
+    client = FebosClient(api)
+    await client.async_login()
+    poller = FebosPoller(client)
+    publisher = FebosPublisher()
+    poller.set_topology(await poller.async_fetch_topology())
+    if not poller.data:
+        raise SystemExit("The recording contains no page configuration")
+    updates = changed = published = 0
+    timings = []
+    while not api.exhausted:
+        if args.speed > 0:
+            await asyncio.sleep(api.next_delay() / args.speed)
+        start = time.perf_counter()
+        await poller.async_update()
+        published += len(
+            publisher.publish(
+                poller.index.keys, poller.values, poller.changed, time.monotonic()
+            )
+        )
+        timings.append(time.perf_counter() - start)
+        updates += 1
+        changed += len(poller.changed)
+    timings.sort()
+    print(
+        f"{len(paths)} files, {len(poller.index.resources)} resources, "
+        f"{updates} updates, {changed} changes, {published} published"
+    )
+    if timings:
+        print(
+            f"{'update':<22} median {timings[len(timings) // 2] * 1000:9.2f} ms  "
+            f"max {timings[-1] * 1000:9.2f} ms"
+        )
+    for endpoint in PARSE_ENDPOINTS:
+        summary = client.stats.summary(endpoint)
+        if summary["calls"]:
+            print(
+                f"{endpoint:<22} median {summary['p50'] * 1000:9.2f} ms  "
+                f"max {summary['max'] * 1000:9.2f} ms  calls {summary['calls']}"
+            )
+
+
+def main() -> None:
+    """Parse the arguments and replay the recording."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=Path, nargs="+")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="replay speed relative to the recording, 0 for as fast as possible",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Headless EmmeTI Febos telemetry collector.
+
+The collector reuses modules of the integration, but the __init__ of the
+integration package sets up Home Assistant entries, pulling in the update
+coordinator and the entity platforms. The package is registered here without
+running it, so only the modules the collector imports are loaded.
+"""
+
+from pathlib import Path
+import sys
+from types import ModuleType
+
+INTEGRATION_PACKAGE = "custom_components.febos"
+
+if INTEGRATION_PACKAGE not in sys.modules:
+    integration = ModuleType(INTEGRATION_PACKAGE)
+    integration.__path__ = [
+        str(Path(__file__).resolve().parents[1] / "custom_components" / "febos")
+    ]
+    sys.modules[INTEGRATION_PACKAGE] = integration
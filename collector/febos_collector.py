@@ -0,0 +1,246 @@
+"""Poll EmmeTI Febos accounts without Home Assistant and export their values.
+
+Reuses the client, poller, scheduler and publisher of the integration, so the
+Home Assistant and febos packages must be importable, but no Home Assistant
+instance is needed. Run from the repository root:
+
+    python -m collector.febos_collector accounts.json --prometheus 9464
+    python -m collector.febos_collector accounts.json --mqtt localhost:1883
+
+accounts.json lists the accounts to poll:
+
+    {"accounts": [{"name": "site-1", "username": "...", "password": "..."}]}
+
+Publishing to MQTT requires the paho-mqtt package.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Any
+
+from febos.api import FebosApi
+from febos.errors import FebosError
+
+from custom_components.febos.client import FebosClient
+from custom_components.febos.const import REQUEST_BURST, REQUEST_RATE
+from custom_components.febos.limiter import FebosRateLimiter
+from custom_components.febos.poller import FebosPoller
+from custom_components.febos.publisher import FebosPublisher
+from custom_components.febos.scheduler import FebosScheduler
+
+LOGGER = logging.getLogger(__name__)
+
+
+def metric_value(value: Any) -> float | None:
+    """Return a value as a Prometheus sample, if numeric."""
+    if isinstance(value, bool | int | float):
+        return float(value)
+    return None
+
+
+def escape_label(value: Any) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def labels(**values: Any) -> str:
+    """Format Prometheus labels."""
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in values.items())
+
+
+class FebosAccountCollector:
+    """Discover and poll one EmmeTI Febos account."""
+
+    def __init__(
+        self, name: str, client: FebosClient, on_publish: Any | None = None
+    ) -> None:
+        """Initialize the account collector."""
+        self.name = name
+        self.client = client
+        self.poller = FebosPoller(client)
+        self.publisher = FebosPublisher()
+        self.scheduler = FebosScheduler()
+        self.on_publish = on_publish
+        self.updated_at: float | None = None
+
+    async def async_run(self) -> None:
+        """Poll the account forever."""
+        while True:
+            try:
+                if not self.poller.data:
+                    await self.client.async_ensure_login()
+                    self.poller.set_topology(await self.poller.async_fetch_topology())
+                    LOGGER.info(
+                        f"{self.name}: {len(self.poller.index.resources)} resources"
+                    )
+                await self.poller.async_update()
+            except FebosError as e:
+                interval = self.scheduler.failure()
+                LOGGER.warning(f"{self.name}: update failed: {e}")
+            except Exception:
+                # Keep polling the other accounts whatever goes wrong here.
+                interval = self.scheduler.failure()
+                LOGGER.exception(f"{self.name}: unexpected error")
+            else:
+                self.updated_at = time.time()
+                published = self.publisher.publish(
+                    self.poller.index.keys,
+                    self.poller.values,
+                    self.poller.changed,
+                    time.monotonic(),
+                )
+                interval = self.scheduler.success(
+                    self.poller.index.active(self.poller.values), bool(published)
+                )
+                if self.on_publish is not None:
+                    self.on_publish(self, published)
+            await asyncio.sleep(interval.total_seconds())
+
+    def metrics(self) -> list[str]:
+        """Return the Prometheus samples of the account."""
+        lines = []
+        for key, value in self.publisher.published.items():
+            if (sample := metric_value(value)) is None:
+                continue
+            device, parent, resource = self.poller.index.entries[key]
+            lines.append(
+                "febos_value{"
+                + labels(
+                    account=self.name,
+                    installation=device["installation_id"],
+                    device=device["id"],
+                    parent=parent["id"],
+                    code=resource.id,
+                    name=resource.name,
+                    unit=resource.unit or "",
+                )
+                + f"}} {sample}"
+            )
+        for endpoint in self.client.stats.endpoints:
+            summary = self.client.stats.summary(endpoint)
+            endpoint_labels = labels(account=self.name, endpoint=endpoint)
+            lines.append(
+                f"febos_api_calls_total{{{endpoint_labels}}} {summary['calls']}"
+            )
+            lines.append(
+                f"febos_api_errors_total{{{endpoint_labels}}} {summary['errors']}"
+            )
+            if summary["mean"] is not None:
+                lines.append(
+                    f"febos_api_latency_seconds{{{endpoint_labels}}} {summary['mean']}"
+                )
+        if self.updated_at is not None:
+            lines.append(
+                f"febos_last_update_timestamp_seconds{{{labels(account=self.name)}}}"
+                f" {self.updated_at}"
+            )
+        return lines
+
+
+def prometheus_text(collectors: list[FebosAccountCollector]) -> str:
+    """Return the Prometheus exposition of every account."""
+    lines = [
+        "# TYPE febos_value gauge",
+        "# TYPE febos_api_calls_total counter",
+        "# TYPE febos_api_errors_total counter",
+        "# TYPE febos_api_latency_seconds gauge",
+        "# TYPE febos_last_update_timestamp_seconds gauge",
+    ]
+    for collector in collectors:
+        lines.extend(collector.metrics())
+    return "\n".join(lines) + "\n"
+
+
+async def async_serve_prometheus(
+    collectors: list[FebosAccountCollector], host: str, port: int
+) -> asyncio.Server:
+    """Serve the metrics of every account over HTTP."""
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        request = await reader.readline()
+        while (await reader.readline()).strip():
+            pass
+        if request.split()[1:2] == [b"/metrics"]:
+            status, body = "200 OK", prometheus_text(collectors).encode()
+        else:
+            status, body = "404 Not Found", b""
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def mqtt_publisher(address: str, prefix: str) -> Any:
+    """Return a callback publishing the changed values to an MQTT broker."""
+    try:
+        import paho.mqtt.client as mqtt
+    except ImportError as e:
+        raise SystemExit("Publishing to MQTT requires the paho-mqtt package") from e
+    host, _, port = address.partition(":")
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    client.connect_async(host, int(port or 1883))
+    client.loop_start()
+
+    def publish(collector: FebosAccountCollector, keys: set[str]) -> None:
+        for key in keys:
+            value = collector.publisher.published.get(key)
+            client.publish(
+                f"{prefix}/{collector.name}/{key}",
+                None if value is None else json.dumps(value),
+                retain=True,
+            )
+
+    return publish
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Poll every account and export the values."""
+    accounts = json.loads(args.accounts.read_text())["accounts"]
+    limiter = FebosRateLimiter(REQUEST_RATE, REQUEST_BURST)
+    on_publish = None if args.mqtt is None else mqtt_publisher(args.mqtt, args.prefix)
+    collectors = [
+        FebosAccountCollector(
+            account.get("name", account["username"]),
+            FebosClient(FebosApi(account["username"], account["password"]), limiter),
+            on_publish,
+        )
+        for account in accounts
+    ]
+    if args.prometheus is not None:
+        await async_serve_prometheus(collectors, args.host, args.prometheus)
+        LOGGER.info(f"Serving metrics on {args.host}:{args.prometheus}/metrics")
+    await asyncio.gather(*(collector.async_run() for collector in collectors))
+
+
+def main() -> None:
+    """Parse the arguments and run the collector."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accounts", type=Path)
+    parser.add_argument("--prometheus", type=int, metavar="PORT")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--mqtt", metavar="HOST[:PORT]")
+    parser.add_argument("--prefix", default="febos")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.prometheus is None and args.mqtt is None:
+        parser.error("at least one of --prometheus and --mqtt is required")
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
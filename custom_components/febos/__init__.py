@@ -1,22 +1,75 @@
 """EmmeTI Febos integration for Home Assistant."""
 
-from febos.api import FebosApi
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from functools import partial
+from pathlib import Path
 
-from .const import PLATFORMS
-from .coordinator import FebosConfigEntry, FebosDataUpdateCoordinator
+from homeassistant.const import (
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import Event, HomeAssistant
+
+from .client import (
+    FebosClient,
+    async_get_client,
+    async_release_client,
+    async_remove_session,
+)
+from .const import CONF_RECORD_TRAFFIC, DOMAIN, PLATFORMS
+from .coordinator import (
+    FebosConfigEntry,
+    FebosDataUpdateCoordinator,
+    topology_store,
+)
+from .recording import FebosRecorder
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: FebosConfigEntry) -> bool:
     """Set up EmmeTI Febos API from a config entry."""
-    api = FebosApi(entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD])
-    entry.runtime_data = FebosDataUpdateCoordinator(hass, entry, api)
+    username = entry.data[CONF_USERNAME]
+    client = await async_get_client(hass, username, entry.data[CONF_PASSWORD])
+    entry.async_on_unload(partial(async_release_client, hass, username))
+    if entry.options.get(CONF_RECORD_TRAFFIC, False):
+        client.recorder = FebosRecorder(
+            Path(hass.config.path(DOMAIN, f"{entry.entry_id}.jsonl.gz"))
+        )
+        entry.async_on_unload(partial(async_stop_recording, hass, client))
+        # Entries are not unloaded on shutdown, so the last records are
+        # flushed when Home Assistant stops.
+        entry.async_on_unload(
+            hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP,
+                partial(async_stop_recording, hass, client),
+            )
+        )
+    entry.runtime_data = FebosDataUpdateCoordinator(hass, entry, client)
     await entry.runtime_data.async_config_entry_first_refresh()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
+async def async_stop_recording(
+    hass: HomeAssistant, client: FebosClient, event: Event | None = None
+) -> None:
+    """Stop recording the API traffic of a client."""
+    if (recorder := client.recorder) is not None:
+        client.recorder = None
+        await hass.async_add_executor_job(recorder.close)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: FebosConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: FebosConfigEntry) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: FebosConfigEntry) -> None:
+    """Remove the cached topology and the persisted session of a config entry."""
+    await topology_store(hass, entry.entry_id).async_remove()
+    await async_remove_session(hass, entry.data[CONF_USERNAME])
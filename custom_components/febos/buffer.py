@@ -0,0 +1,158 @@
+"""EmmeTI Febos recent sample buffer and derived metrics."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import UnitOfPower
+import numpy as np
+
+from .const import BUFFER_SIZE, DERIVED_WINDOW
+from .febos import FebosIndex
+
+DERIVED_MEAN = "mean"
+DERIVED_DUTY_CYCLE = "duty_cycle"
+DERIVED_ENERGY = "energy"
+
+MEAN_SENSOR_CLASSES = {SensorDeviceClass.POWER, SensorDeviceClass.TEMPERATURE}
+
+
+def derived_key(key: str, kind: str) -> str:
+    """Return the key of a metric derived from a resource."""
+    return f"{key}_{kind}"
+
+
+def sample(value: Any) -> float:
+    """Return a value as a float sample, NaN if not numeric."""
+    if isinstance(value, bool | int | float):
+        return float(value)
+    return np.nan
+
+
+class FebosSampleBuffer:
+    """Fixed-size ring buffer of the recent values of the numeric resources."""
+
+    def __init__(
+        self,
+        index: FebosIndex,
+        size: int = BUFFER_SIZE,
+        installation_id: int | None = None,
+    ) -> None:
+        """Allocate the buffer for the resources worth deriving metrics from."""
+        self.entries: list[tuple[Any, Any, Any, str]] = []
+        rows: dict[str, list[int]] = {
+            DERIVED_MEAN: [],
+            DERIVED_DUTY_CYCLE: [],
+            DERIVED_ENERGY: [],
+        }
+        self.keys: list[str] = []
+        for device, parent, resource in index.entries.values():
+            if (
+                installation_id is not None
+                and device["installation_id"] != installation_id
+            ):
+                continue
+            kinds = []
+            if resource.device_class in MEAN_SENSOR_CLASSES:
+                kinds.append(DERIVED_MEAN)
+            if resource.device_class == BinarySensorDeviceClass.RUNNING:
+                kinds.append(DERIVED_DUTY_CYCLE)
+            if resource.unit == UnitOfPower.KILO_WATT:
+                kinds.append(DERIVED_ENERGY)
+            if not kinds:
+                continue
+            for kind in kinds:
+                rows[kind].append(len(self.keys))
+                self.entries.append((device, parent, resource, kind))
+            self.keys.append(resource.key)
+        self.rows = {kind: np.array(r, dtype=np.intp) for kind, r in rows.items()}
+        self.times = np.full(size, np.nan)
+        self.values = np.full((len(self.keys), size), np.nan)
+        self.position = 0
+
+    def append(self, timestamp: float, values: dict[str, Any]) -> None:
+        """Store the current value of every buffered resource."""
+        self.times[self.position] = timestamp
+        self.values[:, self.position] = np.fromiter(
+            (sample(values.get(key)) for key in self.keys),
+            dtype=float,
+            count=len(self.keys),
+        )
+        self.position = (self.position + 1) % self.times.size
+
+    def window(self, now: float, window: timedelta) -> tuple[np.ndarray, np.ndarray]:
+        """Return the samples of the window in chronological order."""
+        order = np.roll(np.arange(self.times.size), -self.position)
+        times = self.times[order]
+        mask = times >= now - window.total_seconds()
+        return times[mask], self.values[:, order][:, mask]
+
+    def derived(
+        self, now: float, window: timedelta = DERIVED_WINDOW
+    ) -> dict[str, float | None]:
+        """Compute the derived metrics of every buffered resource at once."""
+        times, values = self.window(now, window)
+        result: dict[str, float | None] = {}
+        valid = ~np.isnan(values)
+        # The polling interval varies, so each sample counts for the time it
+        # held: until the next sample, or until now for the last one.
+        weights = np.where(valid, np.diff(times, append=now), 0.0)
+
+        rows = self.rows[DERIVED_MEAN]
+        means = self._time_average(values[rows], valid[rows], weights[rows])
+        self._collect(result, rows, DERIVED_MEAN, means)
+
+        rows = self.rows[DERIVED_DUTY_CYCLE]
+        running = (np.where(valid[rows], values[rows], 0.0) > 0).astype(float)
+        duty_cycles = self._time_average(running, valid[rows], weights[rows]) * 100
+        self._collect(result, rows, DERIVED_DUTY_CYCLE, duty_cycles)
+
+        rows = self.rows[DERIVED_ENERGY]
+        energies = np.full(rows.size, np.nan)
+        if times.size >= 2:
+            power = values[rows]
+            hours = np.diff(times) / 3600
+            segments = (power[:, 1:] + power[:, :-1]) / 2 * hours
+            known = ~np.isnan(segments)
+            energies = np.where(
+                known.any(axis=1), np.where(known, segments, 0.0).sum(axis=1), np.nan
+            )
+        self._collect(result, rows, DERIVED_ENERGY, energies)
+        return result
+
+    @staticmethod
+    def _time_average(
+        values: np.ndarray, valid: np.ndarray, weights: np.ndarray
+    ) -> np.ndarray:
+        """Average each row by time, by sample count if no time has elapsed."""
+        known = np.where(valid, values, 0.0)
+        durations = weights.sum(axis=1)
+        counts = valid.sum(axis=1)
+        averages = np.divide(
+            known.sum(axis=1),
+            counts,
+            out=np.full(len(values), np.nan),
+            where=counts > 0,
+        )
+        return np.divide(
+            (known * weights).sum(axis=1),
+            durations,
+            out=averages,
+            where=durations > 0,
+        )
+
+    def _collect(
+        self,
+        result: dict[str, float | None],
+        rows: np.ndarray,
+        kind: str,
+        metrics: np.ndarray,
+    ) -> None:
+        """Store the metrics of a kind by derived key."""
+        for row, metric in zip(rows.tolist(), metrics.tolist(), strict=True):
+            result[derived_key(self.keys[row], kind)] = (
+                None if np.isnan(metric) else metric
+            )
@@ -0,0 +1,235 @@
+"""EmmeTI Febos asynchronous API client.
+
+The febos library only provides a blocking transport built on its own HTTP
+session, and its cloud endpoints are not documented, so each call still runs
+in the executor. A native transport on the shared aiohttp session of Home
+Assistant needs the library to expose one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import contextlib
+from functools import partial
+import time
+from typing import Any
+
+from febos.api import FebosApi
+from febos.errors import AuthenticationError, FebosError
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    SESSION_REFRESH_INTERVAL,
+    SESSION_STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from .limiter import FebosRateLimiter
+from .recording import FebosRecorder
+from .stats import FebosStats, payload_size
+
+DATA_CLIENTS: HassKey[dict[str, FebosClient]] = HassKey(f"{DOMAIN}_clients")
+DATA_LIMITER: HassKey[FebosRateLimiter] = HassKey(f"{DOMAIN}_limiter")
+DATA_SESSIONS: HassKey[tuple[Store, dict[str, Any]]] = HassKey(f"{DOMAIN}_sessions")
+
+
+def request_key(func: Callable[..., Any], args: tuple[Any, ...]) -> tuple[Any, ...]:
+    """Return a hashable identifier of an API request."""
+    return (
+        func.__name__,
+        *(
+            tuple(sorted(arg)) if isinstance(arg, set | frozenset | list) else arg
+            for arg in args
+        ),
+    )
+
+
+def sized_call(call: Callable[[], Any]) -> tuple[Any, int]:
+    """Run a blocking API call and measure its payload in the same thread."""
+    response = call()
+    return response, payload_size(response) if response is not None else 0
+
+
+class FebosClient:
+    """Asynchronous client for the EmmeTI Febos webapp."""
+
+    def __init__(self, api: FebosApi, limiter: FebosRateLimiter | None = None) -> None:
+        """Initialize the client."""
+        self.api = api
+        self.limiter = limiter
+        self.stats = FebosStats()
+        self.users = 0
+        self.logged_in_at: float | None = None
+        self.session_listener: Callable[[], None] | None = None
+        self.recorder: FebosRecorder | None = None
+        self.semaphore: asyncio.Semaphore | None = None
+        self._requests: dict[tuple[Any, ...], asyncio.Future[Any]] = {}
+
+    @property
+    def login_data(self) -> dict[str, Any]:
+        """Return the data received on login."""
+        return getattr(self.api, "login_data", None) or {}
+
+    @property
+    def installation_ids(self) -> list[int]:
+        """Return the installations visible to the logged in account."""
+        return self.login_data.get("installationIdList", [])
+
+    async def _async_call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run an API call, sharing the response of an identical pending call."""
+        key = request_key(func, args)
+        if (request := self._requests.get(key)) is None:
+            request = asyncio.ensure_future(self._async_execute(func, *args))
+            self._requests[key] = request
+            request.add_done_callback(lambda _: self._requests.pop(key, None))
+        return await asyncio.shield(request)
+
+    async def _async_execute(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking API call without blocking the event loop."""
+        installation_id = args[0] if args else None
+        if self.limiter is not None:
+            start = time.perf_counter()
+            await self.limiter.acquire()
+            self.stats.record(
+                "rate_limit", installation_id, time.perf_counter() - start
+            )
+        call = partial(func, *args)
+        if self.recorder is not None:
+            call = partial(self.recorder.call, func, *args)
+        # The concurrency slot is taken only once the call holds a token, so
+        # a queued low priority call never blocks a higher priority one.
+        async with self.semaphore or contextlib.nullcontext():
+            start = time.perf_counter()
+            try:
+                response, size = await asyncio.get_running_loop().run_in_executor(
+                    None, sized_call, call
+                )
+            except FebosError:
+                self.stats.record(
+                    func.__name__,
+                    installation_id,
+                    time.perf_counter() - start,
+                    error=True,
+                )
+                raise
+        self.stats.record(
+            func.__name__, installation_id, time.perf_counter() - start, size
+        )
+        return response
+
+    async def _async_request(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run an authenticated API call, retrying it once after a new login."""
+        if (
+            self.logged_in_at is not None
+            and time.time() - self.logged_in_at
+            >= SESSION_REFRESH_INTERVAL.total_seconds()
+        ):
+            LOGGER.debug("Refreshing session")
+            await self.async_login()
+        try:
+            return await self._async_call(func, *args)
+        except AuthenticationError as e:
+            LOGGER.debug(str(e))
+            await self.async_login()
+            return await self._async_call(func, *args)
+
+    @property
+    def session(self) -> dict[str, Any]:
+        """Return the session to persist across restarts."""
+        return {"login_data": self.login_data, "logged_in_at": self.logged_in_at}
+
+    def restore_session(self, session: dict[str, Any]) -> None:
+        """Restore a persisted session."""
+        self.api.login_data = session["login_data"]
+        self.logged_in_at = session["logged_in_at"]
+
+    async def async_login(self) -> None:
+        """Log into the EmmeTI Febos webapp."""
+        await self._async_call(self.api.login)
+        self.logged_in_at = time.time()
+        LOGGER.debug("Login successful")
+        if self.session_listener is not None:
+            self.session_listener()
+
+    async def async_ensure_login(self) -> None:
+        """Log into the EmmeTI Febos webapp unless already logged in."""
+        if not self.login_data:
+            await self.async_login()
+
+    async def async_page_config(self, installation_id: int) -> dict[str, Any]:
+        """Return the page configuration of an installation."""
+        return await self._async_request(self.api.page_config, installation_id)
+
+    async def async_realtime_data(
+        self, installation_id: int, groups: set[str]
+    ) -> list[dict[str, Any]]:
+        """Return the realtime values of the given input groups."""
+        return await self._async_request(
+            self.api.realtime_data, installation_id, groups
+        )
+
+    async def async_get_febos_slave(
+        self, installation_id: int, device_id: int
+    ) -> list[dict[str, Any]]:
+        """Return the slaves of a device."""
+        return await self._async_request(
+            self.api.get_febos_slave, installation_id, device_id
+        )
+
+
+async def async_get_sessions(
+    hass: HomeAssistant,
+) -> tuple[Store, dict[str, Any]]:
+    """Return the store of the persisted sessions and its loaded content."""
+    if DATA_SESSIONS not in hass.data:
+        store = Store(hass, STORAGE_VERSION, SESSION_STORAGE_KEY, private=True)
+        hass.data[DATA_SESSIONS] = (store, await store.async_load() or {})
+    return hass.data[DATA_SESSIONS]
+
+
+async def async_remove_session(hass: HomeAssistant, username: str) -> None:
+    """Forget the persisted session of an account."""
+    store, sessions = await async_get_sessions(hass)
+    if sessions.pop(username, None) is not None:
+        await store.async_save(sessions)
+
+
+async def async_get_client(
+    hass: HomeAssistant, username: str, password: str
+) -> FebosClient:
+    """Return the client shared by the config entries of an account."""
+    store, sessions = await async_get_sessions(hass)
+    clients = hass.data.setdefault(DATA_CLIENTS, {})
+    if DATA_LIMITER not in hass.data:
+        hass.data[DATA_LIMITER] = FebosRateLimiter(REQUEST_RATE, REQUEST_BURST)
+    if (client := clients.get(username)) is None:
+        client = clients[username] = FebosClient(
+            FebosApi(username, password), hass.data[DATA_LIMITER]
+        )
+        if (session := sessions.get(username)) is not None:
+            client.restore_session(session)
+
+        @callback
+        def save_session() -> None:
+            sessions[username] = client.session
+            store.async_delay_save(lambda: sessions, 1)
+
+        client.session_listener = save_session
+    client.users += 1
+    return client
+
+
+@callback
+def async_release_client(hass: HomeAssistant, username: str) -> None:
+    """Release the client of an account, dropping it once unused."""
+    clients = hass.data.get(DATA_CLIENTS, {})
+    if (client := clients.get(username)) is not None:
+        client.users -= 1
+        if client.users <= 0:
+            del clients[username]
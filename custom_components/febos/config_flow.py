@@ -2,17 +2,49 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigEntryState,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
     TextSelector,
     TextSelectorConfig,
     TextSelectorType,
 )
 
-from .const import DOMAIN
+from .const import (
+    CONF_DEADBANDS,
+    CONF_EXCLUDED_GROUPS,
+    CONF_EXCLUDED_RESOURCES,
+    CONF_EXCLUDED_SLAVES,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_RECORD_TRAFFIC,
+    CONF_SLOW_GROUPS,
+    CONF_SLOW_INTERVAL,
+    CONF_SLOW_SLAVES,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MIN_PUBLISH_INTERVAL_SECONDS,
+    DEFAULT_SLOW_INTERVAL_MINUTES,
+    DOMAIN,
+)
+from .publisher import parse_deadbands
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
@@ -43,6 +75,12 @@ class FebosConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> FebosOptionsFlow:
+        """Create the options flow."""
+        return FebosOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, str] | None = None
     ) -> ConfigFlowResult:
@@ -58,3 +96,148 @@ class FebosConfigFlow(ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors={},
         )
+
+
+class FebosOptionsFlow(OptionsFlow):
+    """Handle the polling options."""
+
+    def __init__(self) -> None:
+        """Initialize the options flow."""
+        self._options: dict[str, Any] = {}
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Choose the polling tiers and the publishing filters."""
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_deadbands(user_input.get(CONF_DEADBANDS, ""))
+            except ValueError:
+                errors[CONF_DEADBANDS] = "invalid_deadbands"
+            else:
+                self._options = user_input
+                return await self.async_step_exclude()
+        if self.config_entry.state is not ConfigEntryState.LOADED:
+            return self.async_abort(reason="not_loaded")
+        coordinator = self.config_entry.runtime_data
+        groups = sorted(
+            {
+                group_code
+                for installation in coordinator.data.values()
+                for group_code in installation["groups"]
+            }
+        )
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_SLOW_GROUPS, default=sorted(coordinator.slow_groups)
+                ): SelectSelector(SelectSelectorConfig(options=groups, multiple=True)),
+                vol.Required(
+                    CONF_SLOW_INTERVAL, default=DEFAULT_SLOW_INTERVAL_MINUTES
+                ): vol.All(
+                    NumberSelector(
+                        NumberSelectorConfig(
+                            min=1,
+                            max=1440,
+                            unit_of_measurement="min",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Coerce(int),
+                ),
+                vol.Required(CONF_SLOW_SLAVES, default=False): BooleanSelector(),
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=DEFAULT_MAX_CONCURRENT_REQUESTS,
+                ): vol.All(
+                    NumberSelector(
+                        NumberSelectorConfig(
+                            min=1, max=32, mode=NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Coerce(int),
+                ),
+                vol.Optional(CONF_DEADBANDS, default=""): TextSelector(
+                    TextSelectorConfig(multiline=True)
+                ),
+                vol.Required(
+                    CONF_MIN_PUBLISH_INTERVAL,
+                    default=DEFAULT_MIN_PUBLISH_INTERVAL_SECONDS,
+                ): vol.All(
+                    NumberSelector(
+                        NumberSelectorConfig(
+                            min=0,
+                            max=3600,
+                            unit_of_measurement="s",
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Coerce(int),
+                ),
+                vol.Required(CONF_RECORD_TRAFFIC, default=False): BooleanSelector(),
+            }
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                schema, user_input or self.config_entry.options
+            ),
+            errors=errors,
+        )
+
+    async def async_step_exclude(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Choose the groups, resources and slaves left out of the requests."""
+        if user_input is not None:
+            return self.async_create_entry(data={**self._options, **user_input})
+        if self.config_entry.state is not ConfigEntryState.LOADED:
+            return self.async_abort(reason="not_loaded")
+        coordinator = self.config_entry.runtime_data
+        groups: set[str] = set()
+        resources: dict[str, str] = {}
+        slaves: dict[str, str] = {}
+        for installation in coordinator.data.values():
+            groups.update(installation["groups"])
+            for device_id, device in installation["devices"].items():
+                for parent in [*device["things"].values(), *device["slaves"].values()]:
+                    for resource in parent["resources"].values():
+                        resources.setdefault(
+                            resource.id, f"{resource.name} ({resource.id})"
+                        )
+                for slave_id, slave in device["slaves"].items():
+                    slaves[f"{device_id}:{slave_id}"] = slave["name"]
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_EXCLUDED_GROUPS, default=[]): SelectSelector(
+                    SelectSelectorConfig(options=sorted(groups), multiple=True)
+                ),
+                vol.Required(CONF_EXCLUDED_RESOURCES, default=[]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=value, label=label)
+                            for value, label in sorted(
+                                resources.items(), key=lambda item: item[1]
+                            )
+                        ],
+                        multiple=True,
+                    )
+                ),
+                vol.Required(CONF_EXCLUDED_SLAVES, default=[]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=value, label=label)
+                            for value, label in slaves.items()
+                        ],
+                        multiple=True,
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(
+            step_id="exclude",
+            data_schema=self.add_suggested_values_to_schema(
+                schema, self.config_entry.options
+            ),
+        )
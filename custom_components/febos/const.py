@@ -1,6 +1,7 @@
 """EmmeTI Febos Constants."""
 
 import logging
+from datetime import timedelta
 
 from homeassistant.const import Platform
 
@@ -8,3 +9,51 @@ DOMAIN = "febos"
 
 LOGGER = logging.getLogger(__package__)
 PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR]
+
+STORAGE_KEY = f"{DOMAIN}.topology"
+TOPOLOGY_REFRESH_INTERVAL = timedelta(hours=6)
+STORAGE_VERSION = 1
+SESSION_STORAGE_KEY = f"{DOMAIN}.sessions"
+SESSION_REFRESH_INTERVAL = timedelta(hours=12)
+
+DEFAULT_UPDATE_INTERVAL = timedelta(minutes=1)
+ACTIVE_UPDATE_INTERVAL = timedelta(seconds=30)
+IDLE_UPDATE_INTERVAL = timedelta(minutes=5)
+IDLE_UPDATE_CYCLES = 5
+MAX_BACKOFF_INTERVAL = timedelta(minutes=30)
+UNIT_RETRY_INTERVAL = timedelta(minutes=1)
+
+REQUEST_RATE = 2.0
+REQUEST_BURST = 10
+PRIORITY_INTERACTIVE = 0
+PRIORITY_POLL = 1
+PRIORITY_BACKGROUND = 2
+
+BUFFER_SIZE = 240
+DERIVED_KEY = f"{DOMAIN}_derived"
+DERIVED_WINDOW = timedelta(hours=1)
+
+STATS_KEY = f"{DOMAIN}_stats"
+STATS_WINDOW = 100
+STATS_ENDPOINTS = ["login", "page_config", "realtime_data", "get_febos_slave"]
+
+RECORDING_BACKUPS = 5
+RECORDING_MAX_BYTES = 10 * 1024 * 1024
+
+TIER_FAST = "fast"
+TIER_SLOW = "slow"
+
+CONF_DEADBANDS = "deadbands"
+CONF_EXCLUDED_GROUPS = "excluded_groups"
+CONF_EXCLUDED_RESOURCES = "excluded_resources"
+CONF_EXCLUDED_SLAVES = "excluded_slaves"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_MIN_PUBLISH_INTERVAL = "min_publish_interval"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_SLOW_GROUPS = "slow_groups"
+CONF_SLOW_INTERVAL = "slow_interval"
+CONF_SLOW_SLAVES = "slow_slaves"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_SLOW_INTERVAL_MINUTES = 15
+DEFAULT_MIN_PUBLISH_INTERVAL_SECONDS = 0
+DEFAULT_DEADBANDS = {"humidity": 1.0, "power": 0.01, "temperature": 0.2}
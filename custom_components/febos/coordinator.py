@@ -2,27 +2,81 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Iterable
 from datetime import timedelta
+import time
+from typing import Any
 
-from febos.api import FebosApi
 from febos.errors import AuthenticationError, FebosError
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, LOGGER
-from .febos import FebosData
+from .buffer import (
+    DERIVED_DUTY_CYCLE,
+    DERIVED_ENERGY,
+    DERIVED_MEAN,
+    FebosSampleBuffer,
+    derived_key,
+)
+from .client import FebosClient
+from .const import (
+    CONF_DEADBANDS,
+    CONF_EXCLUDED_GROUPS,
+    CONF_EXCLUDED_RESOURCES,
+    CONF_EXCLUDED_SLAVES,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_SLOW_GROUPS,
+    CONF_SLOW_INTERVAL,
+    CONF_SLOW_SLAVES,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MIN_PUBLISH_INTERVAL_SECONDS,
+    DEFAULT_SLOW_INTERVAL_MINUTES,
+    DEFAULT_UPDATE_INTERVAL,
+    DERIVED_KEY,
+    DOMAIN,
+    LOGGER,
+    MAX_BACKOFF_INTERVAL,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    STATS_ENDPOINTS,
+    STATS_KEY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    TOPOLOGY_REFRESH_INTERVAL,
+    UNIT_RETRY_INTERVAL,
+)
+from .febos import FebosData, FebosIndex, FebosResource
+from .limiter import priority
+from .poller import FebosParseError, FebosPoller
+from .publisher import FebosPublisher, parse_deadbands
+from .scheduler import FebosScheduler
+from .stats import latency_unique_id
 
 type FebosConfigEntry = ConfigEntry[FebosDataUpdateCoordinator]
+type FebosEntityEntry = tuple[dict[str, Any], dict[str, Any], FebosResource]
+
+
+def topology_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store caching the topology of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry_id}")
 
 
 class FebosDataUpdateCoordinator(DataUpdateCoordinator):
-    """Periodically download the data from the EmmeTI Febos webapp."""
+    """Discover an EmmeTI Febos account and hold the data of its installations."""
 
     def __init__(
-        self, hass: HomeAssistant, config_entry: FebosConfigEntry, api: FebosApi
+        self,
+        hass: HomeAssistant,
+        config_entry: FebosConfigEntry,
+        client: FebosClient,
     ) -> None:
         """Initialize the data service."""
         super().__init__(
@@ -30,135 +84,475 @@ class FebosDataUpdateCoordinator(DataUpdateCoordinator):
             LOGGER,
             config_entry=config_entry,
             name=DOMAIN,
-            update_interval=timedelta(minutes=1),
             always_update=False,
         )
-        self.api = api
-        self.data = {}
+        self.client = client
+        self.poller = FebosPoller(
+            client,
+            max_concurrent_requests=config_entry.options.get(
+                CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+            slow_groups=config_entry.options.get(CONF_SLOW_GROUPS),
+            slow_slaves=config_entry.options.get(CONF_SLOW_SLAVES, False),
+            slow_interval=timedelta(
+                minutes=config_entry.options.get(
+                    CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL_MINUTES
+                )
+            ),
+            excluded_groups=config_entry.options.get(CONF_EXCLUDED_GROUPS),
+            excluded_resources=config_entry.options.get(CONF_EXCLUDED_RESOURCES),
+            excluded_slaves=config_entry.options.get(CONF_EXCLUDED_SLAVES),
+        )
+        self.data = self.poller.data
+        self.publisher = FebosPublisher(
+            parse_deadbands(config_entry.options.get(CONF_DEADBANDS, "")),
+            timedelta(
+                seconds=config_entry.options.get(
+                    CONF_MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL_SECONDS
+                )
+            ),
+        )
+        self.installations: dict[int, FebosInstallationCoordinator] = {}
+        self._key_listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._entity_callbacks: dict[
+            Platform, Callable[[list[FebosEntityEntry]], None]
+        ] = {}
+        self._entity_keys: dict[Platform, set[str]] = {}
+        self._derived_callback: (
+            Callable[[list[tuple[Any, Any, FebosResource, str]]], None] | None
+        ) = None
+        self._derived_keys: set[str] = set()
+        self.buffers: dict[int, FebosSampleBuffer] = {}
+        self.derived: dict[str, float | None] = {}
+        self._topology: dict[str, Any] | None = None
+        self._streamed = False
+        self._store = topology_store(hass, config_entry.entry_id)
+
+    @property
+    def index(self) -> FebosIndex:
+        """Return the resource index."""
+        return self.poller.index
+
+    @property
+    def values(self) -> dict[str, Any]:
+        """Return the last downloaded values by resource key."""
+        return self.poller.values
+
+    @property
+    def changed(self) -> set[str]:
+        """Return the keys of the resources changed by the last update."""
+        return self.poller.changed
+
+    @property
+    def published(self) -> dict[str, Any]:
+        """Return the values written as entity states by resource key."""
+        return self.publisher.published
+
+    @property
+    def slow_groups(self) -> set[str]:
+        """Return the input groups polled at the slow interval."""
+        return self.poller.slow_groups
 
-    def setup_data(self):
+    async def async_setup_data(self):
         """Set up data from EmmeTI Febos webapp."""
-        self.api.login()
-        LOGGER.debug("Login successful")
-        data = {}
-        for inst_id in self.api.login_data.get("installationIdList", []):
-            data[inst_id] = {"id": inst_id, "devices": {}, "groups": set()}
-            response = self.api.page_config(inst_id)
-            for device in response.get("deviceMap", {}).values():
-                device = FebosData.parse_device(device)
-                device["slaves"] = {}
-                device["things"] = {}
-                response2 = self.api.get_febos_slave(inst_id, device["id"])
-                for slave in response2:
-                    slave = FebosData.parse_slave(slave, device)
-                    device["slaves"][slave["id"]] = slave
-                data[inst_id]["devices"][device["id"]] = device
-            for thing in response.get("thingMap", {}).values():
-                device_id = thing["deviceId"]
-                thing = FebosData.parse_thing(thing)
-                data[inst_id]["devices"][device_id]["things"][thing["id"]] = thing
-            for page in response.get("pageMap", {}).values():
-                for tab in page.get("tabList", []):
-                    for widget in tab.get("widgetList", []):
-                        for group in widget.get("widgetInputGroupList", []):
-                            group_code = group["inputGroupGetCode"]
-                            data[inst_id]["groups"].add(group_code)
-                            for resource in group.get("inputList", []):
-                                resource = FebosData.parse_resource(
-                                    resource, inst_id, group_code
-                                )
-                                if resource is not None:
-                                    data[inst_id]["devices"][group["deviceId"]][
-                                        "things"
-                                    ][group["thingId"]]["resources"][
-                                        resource["id"]
-                                    ] = resource
-        self.data = data
+        await self.client.async_ensure_login()
+        self.config_entry.async_on_unload(
+            async_track_time_interval(
+                self.hass, self._async_refresh_topology, TOPOLOGY_REFRESH_INTERVAL
+            )
+        )
+        topology = await self._store.async_load()
+        if topology is not None:
+            try:
+                self._set_topology(topology)
+            except FebosParseError as e:
+                LOGGER.warning(f"Ignoring the cached topology: {e}")
+                topology = None
+        if topology is not None:
+            LOGGER.debug("Setup complete from cached topology")
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_refresh_topology(),
+                f"{DOMAIN} topology revalidation",
+            )
+            return
+        await self._async_stream_topology()
         LOGGER.debug("Setup complete")
 
-    def _fetch_data(self):
-        """Update data from EmmeTI Febos webapp."""
-        for inst_id, installation in self.data.items():
-            response = self.api.realtime_data(inst_id, self.data[inst_id]["groups"])
-            for entry in response:
-                for code, value in entry["data"].items():
-                    value = FebosData.parse_value(value["i"], code)
-                    self.data[inst_id]["devices"][entry["deviceId"]]["things"][
-                        entry["thingId"]
-                    ]["resources"][code]["value"] = value
-            for device_id, device in installation["devices"].items():
-                response = self.api.get_febos_slave(inst_id, device_id)
-                for slave in response:
-                    for code, value in slave.items():
-                        value = FebosData.parse_value(value, code)
-                        resources = device["slaves"][slave["indirizzoSlave"]][
-                            "resources"
-                        ]
-                        if code in resources:
-                            resources[code]["value"] = value
-        LOGGER.debug("Data update")
-
-    def fetch_data(self):
-        """Update data from EmmeTI Febos webapp handling reauthentication."""
+    async def _async_stream_installation(self, inst_id):
+        """Discover an installation and download its first values."""
+        installation = await self.poller.async_fetch_installation_topology(inst_id)
+        self.poller.add_installation(installation)
+        self._set_data()
+        await self.poller.async_update({inst_id})
+        self.async_process_update({inst_id})
+        LOGGER.debug(f"Installation {inst_id} ready")
+        return installation
+
+    async def _async_stream_topology(self):
+        """Set up the installations concurrently, returning once one is ready."""
+        inst_ids = self.client.installation_ids
+        tasks = [
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_stream_installation(inst_id),
+                f"{DOMAIN} installation {inst_id} setup",
+            )
+            for inst_id in inst_ids
+        ]
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            errors = [task.exception() for task in done]
+            if not all(errors):
+                break
+            if not pending:
+                raise errors[0]
+        # The first update already downloaded the values of every ready
+        # installation; the others are added as soon as they are ready.
+        self._streamed = True
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_finish_topology(inst_ids, tasks),
+            f"{DOMAIN} topology setup",
+        )
+
+    async def _async_finish_topology(self, inst_ids, tasks):
+        """Retry the failed installations, then cache the topology."""
+        installations = dict(
+            zip(
+                inst_ids,
+                await asyncio.gather(*tasks, return_exceptions=True),
+                strict=True,
+            )
+        )
+        retries = 0
+        while failed := [
+            inst_id
+            for inst_id, installation in installations.items()
+            if isinstance(installation, BaseException)
+        ]:
+            delay = min(UNIT_RETRY_INTERVAL * 2**retries, MAX_BACKOFF_INTERVAL)
+            retries += 1
+            LOGGER.warning(
+                f"Setup of installations {failed} failed, "
+                f"retrying in {delay.total_seconds():.0f}s"
+            )
+            await asyncio.sleep(delay.total_seconds())
+            if self._topology is not None:
+                # A topology refresh has set up every installation meanwhile.
+                return
+            results = await asyncio.gather(
+                *(self._async_stream_installation(inst_id) for inst_id in failed),
+                return_exceptions=True,
+            )
+            installations.update(zip(failed, results, strict=True))
+        self._topology = {"installations": list(installations.values())}
+        await self._store.async_save(self._topology)
+
+    def _set_topology(self, topology):
+        """Replace the coordinator data with a downloaded or cached topology."""
+        self._topology = topology
+        self.poller.set_topology(topology)
+        self._set_data()
+
+    @callback
+    def _set_data(self) -> None:
+        """Expose the poller data and buffer the resources it describes."""
+        self.data = self.poller.data
+        self._set_buffers()
+        self._async_remove_excluded_entities()
+        self._async_update_installations()
+        self._async_add_derived_entities()
+
+    def _set_buffers(self) -> None:
+        """Buffer each installation apart, keeping the unchanged buffers."""
+        buffers = {}
+        for inst_id in self.data:
+            buffer = FebosSampleBuffer(self.index, installation_id=inst_id)
+            if (current := self.buffers.get(inst_id)) is not None and (
+                current.entries == buffer.entries
+            ):
+                buffer = current
+            buffers[inst_id] = buffer
+        self.buffers = buffers
+        # Rebuild the metrics so that those of the vanished resources go away.
+        now = time.time()
+        self.derived = {
+            key: value
+            for buffer in buffers.values()
+            for key, value in buffer.derived(now).items()
+        }
+
+    @callback
+    def _async_update_installations(self) -> None:
+        """Start a coordinator per new installation, stop the vanished ones."""
+        for inst_id in self.data.keys() - self.installations.keys():
+            installation = FebosInstallationCoordinator(
+                self.hass, self.config_entry, self, inst_id
+            )
+            self.installations[inst_id] = installation
+            # Keep polling the installation even before it has any entity.
+            installation.async_add_listener(lambda: None)
+            self.config_entry.async_on_unload(installation.async_shutdown)
+        for inst_id in self.installations.keys() - self.data.keys():
+            self.config_entry.async_create_task(
+                self.hass, self.installations.pop(inst_id).async_shutdown()
+            )
+
+    async def _async_refresh_topology(self, *_: Any) -> None:
+        """Apply the cloud topology if it differs from the current one."""
         try:
-            self._fetch_data()
-        except AuthenticationError as e:
-            LOGGER.debug(str(e))
-            self.api.login()
-            LOGGER.debug("Login successful")
-            self._fetch_data()
+            with priority(PRIORITY_BACKGROUND):
+                topology = await self.poller.async_fetch_topology()
+        except FebosError as e:
+            LOGGER.warning(f"Topology revalidation failed: {e}")
+            return
+        if topology == self._topology:
+            LOGGER.debug("Topology is up to date")
+            return
+        LOGGER.info("Topology changed, updating entities")
+        await self._store.async_save(topology)
+        self._set_topology(topology)
+        self._async_remove_vanished_entities()
+        for platform in self._entity_callbacks:
+            self._async_add_entities(
+                platform, self.index.populated(platform, self.values)
+            )
+        self.async_update_listeners()
+
+    @callback
+    def async_add_entity_callback(
+        self,
+        platform: Platform,
+        add_entities: Callable[[list[FebosEntityEntry]], None],
+    ) -> None:
+        """Add the entities of a platform now and whenever new ones appear."""
+        self._entity_callbacks[platform] = add_entities
+        self._async_add_entities(platform, self.index.populated(platform, self.values))
+
+    @callback
+    def _async_add_entities(
+        self, platform: Platform, entries: Iterable[FebosEntityEntry]
+    ) -> None:
+        """Add the entities of the resources without one."""
+        known = self._entity_keys.setdefault(platform, set())
+        entries = [entry for entry in entries if entry[2].key not in known]
+        if entries:
+            known.update(resource.key for _, _, resource in entries)
+            LOGGER.debug(f"Adding {len(entries)} {platform} entities")
+            self._entity_callbacks[platform](entries)
+
+    @callback
+    def async_add_derived_callback(
+        self, add_entities: Callable[[list[tuple[Any, Any, FebosResource, str]]], None]
+    ) -> None:
+        """Add the derived metric entities now and whenever new ones appear."""
+        self._derived_callback = add_entities
+        self._async_add_derived_entities()
+
+    @callback
+    def _async_add_derived_entities(self) -> None:
+        """Add the entities of the derived metrics without one."""
+        if self._derived_callback is None:
+            return
+        entries = [
+            entry
+            for buffer in self.buffers.values()
+            for entry in buffer.entries
+            if derived_key(entry[2].key, entry[3]) not in self._derived_keys
+        ]
+        if entries:
+            self._derived_keys.update(
+                derived_key(resource.key, kind) for _, _, resource, kind in entries
+            )
+            self._derived_callback(entries)
+
+    @callback
+    def _async_discover_entities(self, keys: Iterable[str]) -> None:
+        """Add the entities of the resources that received their first value."""
+        discovered: dict[Platform, list[FebosEntityEntry]] = {}
+        for key in keys:
+            entry = self.index.entries.get(key)
+            if entry is None or self.values.get(key) is None:
+                continue
+            if (platform := entry[2].platform) in self._entity_callbacks:
+                discovered.setdefault(platform, []).append(entry)
+        for platform, entries in discovered.items():
+            self._async_add_entities(platform, entries)
+
+    @callback
+    def _async_remove_vanished_entities(self) -> None:
+        """Remove the registered entities of the resources no longer polled."""
+        keys = self.index.keys.keys()
+        for known in self._entity_keys.values():
+            known.intersection_update(keys)
+        self._derived_keys.intersection_update(self.derived)
+        entry_id = self.config_entry.entry_id
+        current = {
+            *keys,
+            *self.derived,
+            *(latency_unique_id(entry_id, endpoint) for endpoint in STATS_ENDPOINTS),
+        }
+        registry = er.async_get(self.hass)
+        for entity in er.async_entries_for_config_entry(registry, entry_id):
+            if entity.unique_id not in current:
+                LOGGER.debug(f"Removing {entity.entity_id}")
+                registry.async_remove(entity.entity_id)
+
+    @callback
+    def _async_remove_excluded_entities(self) -> None:
+        """Remove the entities of the resources excluded by the options."""
+        registry = er.async_get(self.hass)
+        for key in self.poller.excluded_keys:
+            for platform, unique_id in (
+                (Platform.SENSOR, key),
+                (Platform.BINARY_SENSOR, key),
+                *(
+                    (Platform.SENSOR, derived_key(key, kind))
+                    for kind in (DERIVED_MEAN, DERIVED_DUTY_CYCLE, DERIVED_ENERGY)
+                ),
+            ):
+                if entity_id := registry.async_get_entity_id(
+                    platform, DOMAIN, unique_id
+                ):
+                    LOGGER.debug(f"Removing excluded {entity_id}")
+                    registry.async_remove(entity_id)
+
+    async def async_request_refresh(self) -> None:
+        """Refresh every installation ahead of the background requests."""
+        with priority(PRIORITY_INTERACTIVE):
+            await asyncio.gather(
+                *(
+                    installation.async_request_refresh()
+                    for installation in self.installations.values()
+                )
+            )
+
+    async def async_fetch_data(self):
+        """Update data from EmmeTI Febos webapp."""
+        await self.poller.async_update()
+
+    @callback
+    def async_add_key_listener(
+        self, key: str, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for value changes of a single resource."""
+        listeners = self._key_listeners.setdefault(key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                del self._key_listeners[key]
+
+        return remove_listener
+
+    @callback
+    def _async_update_key_listeners(self, keys: set[str]) -> None:
+        """Notify the listeners of the given resources."""
+        for key in (*keys, DERIVED_KEY, STATS_KEY):
+            for update_callback in self._key_listeners.get(key, []):
+                update_callback()
 
     def get_sensors(self):
         """List all EmmeTI Febos sensors."""
-        for installation in self.data.values():
-            for device in installation["devices"].values():
-                for thing in device["things"].values():
-                    for resource in thing["resources"].values():
-                        if (
-                            resource["type"] == Platform.SENSOR
-                            and resource["value"] is not None
-                        ):
-                            yield device, thing, resource
-                for slave in device["slaves"].values():
-                    for resource in slave["resources"].values():
-                        if (
-                            resource["type"] == Platform.SENSOR
-                            and resource["value"] is not None
-                        ):
-                            yield device, slave, resource
+        return self.index.populated(Platform.SENSOR, self.values)
 
     def get_binary_sensors(self):
         """List all EmmeTI Febos binary sensors."""
-        for installation in self.data.values():
-            for device in installation["devices"].values():
-                for thing in device["things"].values():
-                    for resource in thing["resources"].values():
-                        if (
-                            resource["type"] == Platform.BINARY_SENSOR
-                            and resource["value"] is not None
-                        ):
-                            yield device, thing, resource
-                for slave in device["slaves"].values():
-                    for resource in slave["resources"].values():
-                        if (
-                            resource["type"] == Platform.BINARY_SENSOR
-                            and resource["value"] is not None
-                        ):
-                            yield device, slave, resource
+        return self.index.populated(Platform.BINARY_SENSOR, self.values)
 
     async def _async_setup(self):
         """Set up the coordinator."""
         try:
-            await self.hass.async_add_executor_job(self.setup_data)
-        except FebosError as e:
+            await self.async_setup_data()
+        except AuthenticationError as e:
             LOGGER.error(str(e))
             raise ConfigEntryAuthFailed from e
+        except FebosError as e:
+            raise UpdateFailed(str(e)) from e
+
+    @callback
+    def async_process_update(
+        self, installation_ids: Iterable[int] | None = None
+    ) -> set[str]:
+        """Publish the changed values and return the keys of the published ones."""
+        published = self.publisher.publish(
+            self.index.keys, self.values, self.changed, time.monotonic()
+        )
+        LOGGER.debug(
+            f"{len(self.changed)} resources changed, {len(published)} published"
+        )
+        # Sample only the updated installations, so that each buffer spans
+        # the same time whatever the number of installations of the account.
+        now = time.time()
+        for inst_id in self.buffers if installation_ids is None else installation_ids:
+            if (buffer := self.buffers.get(inst_id)) is not None:
+                buffer.append(now, self.values)
+                self.derived.update(buffer.derived(now))
+        self._async_discover_entities(self.changed)
+        self._async_update_key_listeners(published)
+        return published
 
     async def _async_update_data(self) -> FebosData:
-        """Async update wrapper."""
+        """Download the first values of every installation."""
         try:
-            await self.hass.async_add_executor_job(self.fetch_data)
-        except FebosError as e:
+            if self._streamed:
+                self._streamed = False
+            else:
+                await self.async_fetch_data()
+                self.async_process_update()
+        except AuthenticationError as e:
             LOGGER.error(str(e))
             raise ConfigEntryAuthFailed from e
+        except FebosError as e:
+            raise UpdateFailed(str(e)) from e
+        # The data is updated in place, so the base coordinator only notifies
+        # the generic listeners when the availability of the data changes.
         return self.data
+
+
+class FebosInstallationCoordinator(DataUpdateCoordinator[None]):
+    """Periodically download the values of a single installation."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: FebosConfigEntry,
+        account: FebosDataUpdateCoordinator,
+        installation_id: int,
+    ) -> None:
+        """Initialize the installation data service."""
+        super().__init__(
+            hass,
+            LOGGER,
+            config_entry=config_entry,
+            name=f"{DOMAIN} {installation_id}",
+            update_interval=DEFAULT_UPDATE_INTERVAL,
+            always_update=False,
+        )
+        self.account = account
+        self.installation_id = installation_id
+        self.scheduler = FebosScheduler()
+
+    async def _async_update_data(self) -> None:
+        """Update the installation and publish its changed values."""
+        account = self.account
+        try:
+            await account.poller.async_update({self.installation_id})
+        except AuthenticationError as e:
+            LOGGER.error(str(e))
+            raise ConfigEntryAuthFailed from e
+        except FebosError as e:
+            self.update_interval = self.scheduler.failure()
+            raise UpdateFailed(str(e)) from e
+        published = account.async_process_update({self.installation_id})
+        # Jitter within the deadbands does not keep the plant from being stable.
+        self.update_interval = self.scheduler.success(
+            account.index.active(account.values, self.installation_id),
+            bool(published),
+        )
@@ -0,0 +1,62 @@
+"""Diagnostics support for the EmmeTI Febos integration."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .coordinator import FebosConfigEntry
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: FebosConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "installations": {
+            str(inst_id): {
+                "devices": len(installation["devices"]),
+                "groups": len(installation["groups"]),
+                "slow_groups": sorted(
+                    set(installation["groups"]) & coordinator.slow_groups
+                ),
+                "update_interval": str(
+                    coordinator.installations[inst_id].update_interval
+                ),
+                "last_update_success": (
+                    coordinator.installations[inst_id].last_update_success
+                ),
+            }
+            for inst_id, installation in coordinator.data.items()
+        },
+        "resources": len(coordinator.index.resources),
+        "units": {
+            " ".join(str(part) for part in key): {
+                "errors": unit.errors,
+                "error": unit.error,
+                "updated_at": (
+                    None
+                    if unit.updated_at is None
+                    else datetime.fromtimestamp(unit.updated_at, UTC).isoformat()
+                ),
+            }
+            for key, unit in coordinator.poller.units.items()
+        },
+        "publisher": {
+            "deadbands": coordinator.publisher.deadbands,
+            "pending": len(coordinator.publisher.pending),
+            "suppressed": coordinator.publisher.suppressed,
+        },
+        "stats": coordinator.client.stats.as_dict(),
+    }
@@ -0,0 +1,81 @@
+"""EmmeTI Febos base entity."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import FebosDataUpdateCoordinator
+from .febos import FebosResource
+
+
+def device_info(device: dict[str, Any], thing: dict[str, Any]) -> DeviceInfo:
+    """Return the device of a thing or slave."""
+    return DeviceInfo(
+        identifiers={
+            (
+                DOMAIN,
+                device["installation_id"],
+                device["id"],
+                thing["id"],
+            )
+        },
+        entry_type=DeviceEntryType.SERVICE,
+        manufacturer=device["manufacturer"],
+        model=device["model"],
+        name=thing["name"],
+    )
+
+
+class FebosEntity(CoordinatorEntity[FebosDataUpdateCoordinator]):
+    """Defines an EmmeTI Febos entity bound to a single resource."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: FebosDataUpdateCoordinator,
+        description: EntityDescription,
+        device: dict[str, Any],
+        thing: dict[str, Any],
+        resource: FebosResource,
+    ) -> None:
+        """Initialize EmmeTI Febos entity."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = description.key
+        self._attr_name = resource.name
+        self._attr_device_info = device_info(device, thing)
+        self.resource = resource
+        self.installation_id = device["installation_id"]
+
+    @property
+    def available(self) -> bool:
+        """Return true if the last update of the installation succeeded."""
+        installation = self.coordinator.installations.get(self.installation_id)
+        return super().available and (
+            installation is None or installation.last_update_success
+        )
+
+    @property
+    def value(self) -> Any:
+        """Return the last published value of the resource."""
+        return self.coordinator.published.get(self.resource.key)
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state only when the value of the resource changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_key_listener(
+                self.entity_description.key, self._handle_coordinator_update
+            )
+        )
+        if installation := self.coordinator.installations.get(self.installation_id):
+            # Only notified when the availability of the installation changes.
+            self.async_on_remove(
+                installation.async_add_listener(self._handle_coordinator_update)
+            )
@@ -1,5 +1,10 @@
 """EmmeTI Febos helpers for Home Assistant integration."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
@@ -12,7 +17,7 @@ from homeassistant.const import (
     UnitOfVolumeFlowRate,
 )
 
-from .const import DOMAIN, LOGGER
+from .const import DOMAIN, LOGGER, TIER_FAST, TIER_SLOW
 
 SLAVE_RESOURCE_MAPPING = {
     "callTemp": {
@@ -66,6 +71,156 @@ SLAVE_RESOURCE_MAPPING = {
 }
 
 
+MEASUREMENT_UNITS = {
+    "kW": UnitOfPower.KILO_WATT,
+    "°C": UnitOfTemperature.CELSIUS,
+    "°": UnitOfTemperature.CELSIUS,
+    "h": UnitOfTime.HOURS,
+    "HH:mm": UnitOfTime.MINUTES,
+    "watt/h": UnitOfEnergy.WATT_HOUR,
+    "L/h": UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
+    "%": PERCENTAGE,
+}
+
+SENSOR_CLASSES = {
+    "kW": SensorDeviceClass.POWER,
+    "°C": SensorDeviceClass.TEMPERATURE,
+    "°": SensorDeviceClass.TEMPERATURE,
+    "h": SensorDeviceClass.DURATION,
+    "HH:mm": SensorDeviceClass.DURATION,
+    "watt/h": SensorDeviceClass.ENERGY,
+    "L/h": SensorDeviceClass.VOLUME_FLOW_RATE,
+    "%": SensorDeviceClass.HUMIDITY,
+    " ": SensorDeviceClass.ENUM,
+    "": SensorDeviceClass.ENUM,
+}
+
+STATE_CLASSES = {
+    SensorDeviceClass.ENERGY: SensorStateClass.TOTAL,
+    SensorDeviceClass.TIMESTAMP: None,
+    SensorDeviceClass.ENUM: None,
+}
+
+BINARY_SENSOR_CLASSES = {
+    "R8683": BinarySensorDeviceClass.COLD,
+    "R16385": BinarySensorDeviceClass.COLD,
+    "R9089": BinarySensorDeviceClass.PROBLEM,
+    "R9090": BinarySensorDeviceClass.PROBLEM,
+    "R9095": BinarySensorDeviceClass.PROBLEM,
+    "R9096": BinarySensorDeviceClass.PROBLEM,
+    "R9097": BinarySensorDeviceClass.PROBLEM,
+    "R9098": BinarySensorDeviceClass.PROBLEM,
+    "R9099": BinarySensorDeviceClass.PROBLEM,
+    "R9102": BinarySensorDeviceClass.PROBLEM,
+    "R9103": BinarySensorDeviceClass.PROBLEM,
+    "R9104": BinarySensorDeviceClass.PROBLEM,
+    "R16384": BinarySensorDeviceClass.RUNNING,
+    "R8681": BinarySensorDeviceClass.RUNNING,
+    "R8682": BinarySensorDeviceClass.RUNNING,
+    "R8692": BinarySensorDeviceClass.RUNNING,
+    "R9072": BinarySensorDeviceClass.RUNNING,
+    "R9073": BinarySensorDeviceClass.RUNNING,
+    "R9074": BinarySensorDeviceClass.RUNNING,
+    "R8672": BinarySensorDeviceClass.WINDOW,
+    "R8673": BinarySensorDeviceClass.PRESENCE,
+    "R8676": BinarySensorDeviceClass.PRESENCE,
+}
+
+INVERTED_BINARY_SENSOR_CLASSES = frozenset(
+    {BinarySensorDeviceClass.COLD, BinarySensorDeviceClass.PRESENCE}
+)
+
+VALUE_DIVISORS = {
+    "R8702": 10.0,
+    "R8703": 10.0,
+    "R8678": 10.0,
+    "R8680": 10.0,
+    "R8986": 10.0,
+    "R8987": 10.0,
+    "R8988": 10.0,
+    "R16444": 10.0,
+    "R16446": 10.0,
+    "R16448": 10.0,
+    "R16450": 10.0,
+    "R16451": 10.0,
+    "R16453": 10.0,
+    "R16455": 10.0,
+    "R16457": 10.0,
+    "R8989": 10.0,
+    "R8698": 10.0,
+    "setTemp": 10.0,
+    "temp": 10.0,
+    "R8684": 100.0,
+    "R8686": 100.0,
+    "R8688": 100.0,
+    "R8690": 100.0,
+    "R8220": 1000.0,
+    "R8221": 1000.0,
+    "R8222": 1000.0,
+    "R8223": 1000.0,
+}
+
+VALUE_MULTIPLIERS = {
+    "R9120": 60.0,
+}
+
+
+def decode_value(value):
+    """Decode a raw value that needs no scaling."""
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def decode_divided_value(divisor, value):
+    """Decode a raw value scaled down by a fixed divisor."""
+    if isinstance(value, str):
+        return value.strip()
+    return float(value) / divisor
+
+
+def decode_multiplied_value(factor, value):
+    """Decode a raw value scaled up by a fixed factor."""
+    if isinstance(value, str):
+        return value.strip()
+    return float(value) * factor
+
+
+VALUE_DECODERS = {
+    **{
+        code: partial(decode_divided_value, divisor)
+        for code, divisor in VALUE_DIVISORS.items()
+    },
+    **{
+        code: partial(decode_multiplied_value, factor)
+        for code, factor in VALUE_MULTIPLIERS.items()
+    },
+}
+
+
+def value_decoder(code):
+    """Return the decoder of the values of a resource."""
+    return VALUE_DECODERS.get(code, decode_value)
+
+
+SLOW_SENSOR_CLASSES = {SensorDeviceClass.DURATION, SensorDeviceClass.ENERGY}
+
+
+@dataclass(frozen=True, slots=True)
+class FebosResource:
+    """Static description of an EmmeTI Febos resource."""
+
+    id: str
+    key: str
+    name: str
+    platform: Platform
+    device_class: BinarySensorDeviceClass | SensorDeviceClass | None
+    state_class: SensorStateClass | None = None
+    unit: str | None = None
+    decode: Callable[[Any], Any] = decode_value
+    inverted: bool = False
+
+
 def resource_key(
     installation_id: int,
     group_code: str,
@@ -100,87 +255,29 @@ def parse_sensor_name(name: str) -> str:
 
 def measurement_unit(meas_unit):
     """Return the measurement unit as a Home Assistant enum."""
-    return {
-        "kW": UnitOfPower.KILO_WATT,
-        "°C": UnitOfTemperature.CELSIUS,
-        "°": UnitOfTemperature.CELSIUS,
-        "h": UnitOfTime.HOURS,
-        "HH:mm": UnitOfTime.MINUTES,
-        "watt/h": UnitOfEnergy.WATT_HOUR,
-        "L/h": UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
-        "%": PERCENTAGE,
-    }.get(meas_unit)
+    return MEASUREMENT_UNITS.get(meas_unit)
 
 
 def sensor_class(meas_unit):
     """Return the sensor class."""
-    return {
-        "kW": SensorDeviceClass.POWER,
-        "°C": SensorDeviceClass.TEMPERATURE,
-        "°": SensorDeviceClass.TEMPERATURE,
-        "h": SensorDeviceClass.DURATION,
-        "HH:mm": SensorDeviceClass.DURATION,
-        "watt/h": SensorDeviceClass.ENERGY,
-        "L/h": SensorDeviceClass.VOLUME_FLOW_RATE,
-        "%": SensorDeviceClass.HUMIDITY,
-        " ": SensorDeviceClass.ENUM,
-        "": SensorDeviceClass.ENUM,
-    }.get(meas_unit)
+    return SENSOR_CLASSES.get(meas_unit)
 
 
 def state_class(sens_class):
     """Return the state class."""
-    {
-        SensorDeviceClass.ENERGY: SensorStateClass.TOTAL,
-        SensorDeviceClass.TIMESTAMP: None,
-    }.get(sens_class, SensorStateClass.MEASUREMENT)
-
-
-def sensor_value(res):
-    """Return the sensor value."""
-    if res["value"] is None:
-        return None
-    return res["value"]
+    return STATE_CLASSES.get(sens_class, SensorStateClass.MEASUREMENT)
 
 
-def binary_sensor_value(res):
+def binary_sensor_value(resource, value):
     """Return the binary sensor value."""
-    if res["value"] is None:
+    if value is None:
         return None
-    if res["class"] in [
-        BinarySensorDeviceClass.COLD,
-        BinarySensorDeviceClass.PRESENCE,
-    ]:
-        return not bool(res["value"])
-    return bool(res["value"])
+    return bool(value) != resource.inverted
 
 
 def binary_sensor_class(code):
     """Return the binary sensor class."""
-    sens_class = {
-        "R8683": BinarySensorDeviceClass.COLD,
-        "R16385": BinarySensorDeviceClass.COLD,
-        "R9089": BinarySensorDeviceClass.PROBLEM,
-        "R9090": BinarySensorDeviceClass.PROBLEM,
-        "R9095": BinarySensorDeviceClass.PROBLEM,
-        "R9096": BinarySensorDeviceClass.PROBLEM,
-        "R9097": BinarySensorDeviceClass.PROBLEM,
-        "R9098": BinarySensorDeviceClass.PROBLEM,
-        "R9099": BinarySensorDeviceClass.PROBLEM,
-        "R9102": BinarySensorDeviceClass.PROBLEM,
-        "R9103": BinarySensorDeviceClass.PROBLEM,
-        "R9104": BinarySensorDeviceClass.PROBLEM,
-        "R16384": BinarySensorDeviceClass.RUNNING,
-        "R8681": BinarySensorDeviceClass.RUNNING,
-        "R8682": BinarySensorDeviceClass.RUNNING,
-        "R8692": BinarySensorDeviceClass.RUNNING,
-        "R9072": BinarySensorDeviceClass.RUNNING,
-        "R9073": BinarySensorDeviceClass.RUNNING,
-        "R9074": BinarySensorDeviceClass.RUNNING,
-        "R8672": BinarySensorDeviceClass.WINDOW,
-        "R8673": BinarySensorDeviceClass.PRESENCE,
-        "R8676": BinarySensorDeviceClass.PRESENCE,
-    }.get(code)
+    sens_class = BINARY_SENSOR_CLASSES.get(code)
     if sens_class is None:
         LOGGER.warning(f"Unsupported sensor class for {code}")
     return sens_class
@@ -212,17 +309,27 @@ class FebosData:
         }
         for k in slave:
             if k in SLAVE_RESOURCE_MAPPING:
-                sensor = SLAVE_RESOURCE_MAPPING.get(k).copy()
-                sensor["key"] = slave_resource_key(
-                    device["installation_id"], device["id"], slave["indirizzoSlave"], k
+                mapping = SLAVE_RESOURCE_MAPPING[k]
+                sensor = FebosResource(
+                    id=mapping["id"],
+                    key=slave_resource_key(
+                        device["installation_id"],
+                        device["id"],
+                        slave["indirizzoSlave"],
+                        k,
+                    ),
+                    name=mapping["name"],
+                    platform=mapping["type"],
+                    device_class=mapping["class"],
+                    state_class=mapping.get("state"),
+                    unit=mapping.get("unit"),
+                    decode=value_decoder(k),
+                    inverted=mapping["class"] in INVERTED_BINARY_SENSOR_CLASSES,
                 )
-                sensor["value"] = None
-                if sensor["type"] == Platform.BINARY_SENSOR:
-                    sensor["value_fn"] = lambda s=sensor: binary_sensor_value(s)
-                    LOGGER.debug(f"[BINARY_SENSOR][{sensor['key']}] {sensor}")
+                if sensor.platform == Platform.BINARY_SENSOR:
+                    LOGGER.debug(f"[BINARY_SENSOR][{sensor.key}] {sensor}")
                 else:
-                    sensor["value_fn"] = lambda s=sensor: sensor_value(s)
-                    LOGGER.debug(f"[SENSOR][{sensor['key']}] {sensor}")
+                    LOGGER.debug(f"[SENSOR][{sensor.key}] {sensor}")
                 slv["resources"][k] = sensor
         return slv
 
@@ -255,67 +362,132 @@ class FebosData:
         input_type = resource.get("inputType")
         if input_type == "BOOL":
             sens_class = binary_sensor_class(resource.get("code"))
-            sensor = {
-                "id": resource["code"],
-                "key": key,
-                "name": name,
-                "type": Platform.BINARY_SENSOR,
-                "class": sens_class,
-                "value": None,
-            }
-            sensor["value_fn"] = lambda s=sensor: binary_sensor_value(s)
+            sensor = FebosResource(
+                id=resource["code"],
+                key=key,
+                name=name,
+                platform=Platform.BINARY_SENSOR,
+                device_class=sens_class,
+                decode=value_decoder(resource["code"]),
+                inverted=sens_class in INVERTED_BINARY_SENSOR_CLASSES,
+            )
             LOGGER.debug(f"[BINARY_SENSOR][{key}] {sensor}")
             return sensor
         if input_type in ["INT", "FLOAT", "STRING"]:
             meas_unit = measurement_unit(resource.get("measUnit"))
             sens_class = sensor_class(resource.get("measUnit"))
-            sensor = {
-                "id": resource["code"],
-                "key": key,
-                "name": name,
-                "type": Platform.SENSOR,
-                "class": sens_class,
-                "state": state_class(sens_class),
-                "unit": meas_unit,
-                "value": None,
-            }
-            sensor["value_fn"] = lambda s=sensor: sensor_value(s)
+            sensor = FebosResource(
+                id=resource["code"],
+                key=key,
+                name=name,
+                platform=Platform.SENSOR,
+                device_class=sens_class,
+                state_class=state_class(sens_class),
+                unit=meas_unit,
+                decode=value_decoder(resource["code"]),
+            )
             LOGGER.debug(f"[SENSOR][{key}] {sensor}")
             return sensor
         LOGGER.error(f"Unsupported input type {input_type} for {key}")
         return None
 
+    @staticmethod
+    def parse_slave_topology(slave):
+        """Strip the live values from an EmmeTI Febos slave."""
+        return {k: slave[k] if k == "indirizzoSlave" else None for k in slave}
+
+    @staticmethod
+    def parse_installation(installation_id, page_config, slaves):
+        """Parse an EmmeTI Febos installation topology."""
+        installation = {"id": installation_id, "devices": {}, "groups": {}}
+        devices = installation["devices"]
+        for device in page_config.get("deviceMap", {}).values():
+            device = FebosData.parse_device(device)
+            device["slaves"] = {}
+            device["things"] = {}
+            for slave in slaves.get(device["id"], []):
+                slave = FebosData.parse_slave(slave, device)
+                device["slaves"][slave["id"]] = slave
+            devices[device["id"]] = device
+        for thing in page_config.get("thingMap", {}).values():
+            device_id = thing["deviceId"]
+            thing = FebosData.parse_thing(thing)
+            devices[device_id]["things"][thing["id"]] = thing
+        for page in page_config.get("pageMap", {}).values():
+            for tab in page.get("tabList", []):
+                for widget in tab.get("widgetList", []):
+                    for group in widget.get("widgetInputGroupList", []):
+                        group_code = group["inputGroupGetCode"]
+                        resources = installation["groups"].setdefault(group_code, [])
+                        for resource in group.get("inputList", []):
+                            resource = FebosData.parse_resource(
+                                resource, installation_id, group_code
+                            )
+                            if resource is not None:
+                                resources.append(resource)
+                                devices[group["deviceId"]]["things"][
+                                    group["thingId"]
+                                ]["resources"][resource.id] = resource
+        return installation
+
+    @staticmethod
+    def group_tier(resources):
+        """Return the polling tier of an input group from its resources."""
+        if resources and all(r.device_class in SLOW_SENSOR_CLASSES for r in resources):
+            return TIER_SLOW
+        return TIER_FAST
+
     @staticmethod
     def parse_value(value, code):
         """Parse an EmmeTI Febos resource value."""
-        if isinstance(value, str):
-            return value.strip()
-        if code in ["R9120"]:
-            return float(value) * 60.0
-        if code in [
-            "R8702",
-            "R8703",
-            "R8678",
-            "R8680",
-            "R8986",
-            "R8987",
-            "R8988",
-            "R16444",
-            "R16446",
-            "R16448",
-            "R16450",
-            "R16451",
-            "R16453",
-            "R16455",
-            "R16457",
-            "R8989",
-            "R8698",
-            "setTemp",
-            "temp",
-        ]:
-            return float(value) / 10.0
-        if code in ["R8684", "R8686", "R8688", "R8690"]:
-            return float(value) / 100.0
-        if code in ["R8220", "R8221", "R8222", "R8223"]:
-            return float(value) / 1000.0
-        return value
+        return value_decoder(code)(value)
+
+
+class FebosIndex:
+    """Flat lookup tables over a parsed EmmeTI Febos topology."""
+
+    def __init__(self, data, excluded=frozenset()):
+        """Index the resources of every installation, except the excluded keys."""
+        self.resources = {}
+        self.keys = {}
+        self.entries = {}
+        self.platforms = {Platform.SENSOR: [], Platform.BINARY_SENSOR: []}
+        self.activity = []
+        for inst_id, installation in data.items():
+            for device_id, device in installation["devices"].items():
+                parents = [*device["things"].values(), *device["slaves"].values()]
+                for parent in parents:
+                    for code, resource in parent["resources"].items():
+                        if resource.key in excluded:
+                            continue
+                        self.resources[(inst_id, device_id, parent["id"], code)] = (
+                            resource
+                        )
+                        self.keys[resource.key] = resource
+                        self.entries[resource.key] = (device, parent, resource)
+                        self.platforms[resource.platform].append(
+                            (device, parent, resource)
+                        )
+                        if (
+                            resource.device_class == BinarySensorDeviceClass.RUNNING
+                            or code == "callTemp"
+                        ):
+                            self.activity.append((inst_id, resource))
+
+    def get(self, installation_id, device_id, parent_id, code):
+        """Return a resource of a thing or slave, if known."""
+        return self.resources.get((installation_id, device_id, parent_id, code))
+
+    def active(self, values, installation_id=None):
+        """Return true if any compressor, pump or thermostat call is running."""
+        return any(
+            values.get(resource.key)
+            for inst_id, resource in self.activity
+            if installation_id is None or inst_id == installation_id
+        )
+
+    def populated(self, platform, values):
+        """List the resources of a platform that received a value."""
+        for device, parent, resource in self.platforms[platform]:
+            if values.get(resource.key) is not None:
+                yield device, parent, resource
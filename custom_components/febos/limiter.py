@@ -0,0 +1,88 @@
+"""EmmeTI Febos API rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+from itertools import count
+import time
+
+from .const import PRIORITY_POLL
+
+request_priority: ContextVar[int] = ContextVar(
+    "febos_request_priority", default=PRIORITY_POLL
+)
+
+
+@contextmanager
+def priority(value: int) -> Iterator[None]:
+    """Run the API calls made within the block at the given priority."""
+    token = request_priority.set(value)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class FebosRateLimiter:
+    """Token bucket granting API calls in priority order."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize the bucket full."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of calls waiting for a token."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority: int | None = None) -> None:
+        """Wait for a token, served before any waiting call of lower priority."""
+        if priority is None:
+            priority = request_priority.get()
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += 1
+            raise
+
+    def _schedule(self) -> None:
+        """Wake up the waiters once the next token is available."""
+        if self._timer is None and self._waiters:
+            delay = max((1 - self.tokens) / self.rate, 0)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        """Grant the available tokens to the waiters of highest priority."""
+        self._timer = None
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+        self._schedule()
@@ -0,0 +1,385 @@
+"""EmmeTI Febos account poller."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import partial
+import time
+from typing import Any
+
+from febos.errors import AuthenticationError, FebosError
+
+from .client import FebosClient
+from .const import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SLOW_INTERVAL_MINUTES,
+    LOGGER,
+    MAX_BACKOFF_INTERVAL,
+    PRIORITY_BACKGROUND,
+    TIER_SLOW,
+    UNIT_RETRY_INTERVAL,
+)
+from .febos import FebosData, FebosIndex
+from .limiter import priority
+
+PARSE_ERRORS = (AttributeError, KeyError, TypeError, ValueError)
+
+
+class FebosParseError(FebosError):
+    """Raised when a response of the webapp does not have the expected shape."""
+
+
+class FebosPoller:
+    """Discover and poll the installations of an EmmeTI Febos account."""
+
+    def __init__(
+        self,
+        client: FebosClient,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        slow_groups: list[str] | None = None,
+        slow_slaves: bool = False,
+        slow_interval: timedelta = timedelta(minutes=DEFAULT_SLOW_INTERVAL_MINUTES),
+        excluded_groups: list[str] | None = None,
+        excluded_resources: list[str] | None = None,
+        excluded_slaves: list[str] | None = None,
+    ) -> None:
+        """Initialize the poller."""
+        self.client = client
+        self.data: dict[int, dict[str, Any]] = {}
+        self.index = FebosIndex(self.data)
+        self.values: dict[str, Any] = {}
+        self.changed: set[str] = set()
+        self.slow_groups: set[str] = set()
+        self.slow_slaves = slow_slaves
+        self.slow_interval = slow_interval
+        self.units: dict[tuple[Any, ...], FebosUnit] = {}
+        self.prefetched: dict[tuple[int, int], list[dict[str, Any]]] = {}
+        self.excluded_groups = set(excluded_groups or ())
+        self.excluded_resources = set(excluded_resources or ())
+        self.excluded_slaves = set(excluded_slaves or ())
+        self.excluded_keys: set[str] = set()
+        self.polled_groups: dict[int, set[str]] = {}
+        self.polled_slaves: set[tuple[int, int]] = set()
+        self._slow_groups_option = slow_groups
+        client.semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+    async def async_fetch_installation_topology(self, inst_id):
+        """Download the topology of an installation, keeping its slave values."""
+        page_config = await self.client.async_page_config(inst_id)
+        try:
+            device_ids = [
+                device["id"] for device in page_config.get("deviceMap", {}).values()
+            ]
+        except PARSE_ERRORS as e:
+            raise FebosParseError(
+                f"Unexpected page configuration of installation {inst_id}: {e!r}"
+            ) from e
+        responses = await asyncio.gather(
+            *(
+                self.client.async_get_febos_slave(inst_id, dev_id)
+                for dev_id in device_ids
+            )
+        )
+        for device_id, response in zip(device_ids, responses, strict=True):
+            self.prefetched[(inst_id, device_id)] = response
+        return {
+            "id": inst_id,
+            "page_config": page_config,
+            "slaves": [
+                {
+                    "device_id": device_id,
+                    "slaves": [FebosData.parse_slave_topology(s) for s in response],
+                }
+                for device_id, response in zip(device_ids, responses, strict=True)
+            ],
+        }
+
+    async def async_fetch_topology(self):
+        """Download the topology of every installation of the account."""
+        installations = await asyncio.gather(
+            *(
+                self.async_fetch_installation_topology(inst_id)
+                for inst_id in self.client.installation_ids
+            )
+        )
+        return {"installations": installations}
+
+    @staticmethod
+    def parse_installation_topology(installation):
+        """Build the poller data of an installation from its topology."""
+        try:
+            return FebosData.parse_installation(
+                installation["id"],
+                installation["page_config"],
+                {s["device_id"]: s["slaves"] for s in installation["slaves"]},
+            )
+        except PARSE_ERRORS as e:
+            raise FebosParseError(
+                f"Unexpected topology of installation {installation['id']}: {e!r}"
+            ) from e
+
+    @staticmethod
+    def parse_topology(topology):
+        """Build the poller data from a downloaded or cached topology."""
+        return {
+            installation["id"]: FebosPoller.parse_installation_topology(installation)
+            for installation in topology["installations"]
+        }
+
+    def set_topology(self, topology):
+        """Replace the poller data with a downloaded or cached topology."""
+        start = time.perf_counter()
+        self.data = self.parse_topology(topology)
+        self._set_index(start)
+
+    def add_installation(self, installation):
+        """Add or replace the data of a single installation."""
+        start = time.perf_counter()
+        self.data[installation["id"]] = self.parse_installation_topology(installation)
+        self._set_index(start)
+
+    def _excluded_keys(self):
+        """Return the keys of the resources excluded by the options."""
+        excluded = set()
+        for installation in self.data.values():
+            for code in self.excluded_groups & installation["groups"].keys():
+                excluded.update(r.key for r in installation["groups"][code])
+            for device_id, device in installation["devices"].items():
+                for parent in [*device["things"].values(), *device["slaves"].values()]:
+                    excluded.update(
+                        resource.key
+                        for resource in parent["resources"].values()
+                        if resource.id in self.excluded_resources
+                    )
+                for slave_id, slave in device["slaves"].items():
+                    if f"{device_id}:{slave_id}" in self.excluded_slaves:
+                        excluded.update(r.key for r in slave["resources"].values())
+        return excluded
+
+    def _set_index(self, start):
+        """Index the poller data and classify its input groups."""
+        self.excluded_keys = self._excluded_keys()
+        self.index = index = FebosIndex(self.data, self.excluded_keys)
+        # Only request the groups and slaves with at least one indexed resource.
+        self.polled_groups = {
+            inst_id: {
+                code
+                for code, resources in installation["groups"].items()
+                if any(r.key in index.keys for r in resources)
+            }
+            for inst_id, installation in self.data.items()
+        }
+        self.polled_slaves = {
+            (inst_id, device_id)
+            for inst_id, installation in self.data.items()
+            for device_id, device in installation["devices"].items()
+            if any(
+                r.key in index.keys
+                for slave in device["slaves"].values()
+                for r in slave["resources"].values()
+            )
+        }
+        self.client.stats.record("parse_topology", None, time.perf_counter() - start)
+        slow_groups = self._slow_groups_option
+        if slow_groups is None:
+            slow_groups = [
+                group_code
+                for installation in self.data.values()
+                for group_code, resources in installation["groups"].items()
+                if FebosData.group_tier(resources) == TIER_SLOW
+            ]
+        self.slow_groups = set(slow_groups)
+
+    def _apply_value(self, inst_id, device_id, parent_id, code, value):
+        """Store a downloaded value into its resource."""
+        resource = self.index.get(inst_id, device_id, parent_id, code)
+        if resource is None:
+            return False
+        value = resource.decode(value)
+        if self.values.get(resource.key) != value:
+            self.values[resource.key] = value
+            self.changed.add(resource.key)
+        return True
+
+    def _due_groups(self, inst_id, slow_due):
+        """Return the input groups of an installation due for an update."""
+        groups = self.polled_groups.get(inst_id, set())
+        if slow_due:
+            return groups
+        return groups - self.slow_groups
+
+    def _unit(self, key):
+        """Return the state of an independently fetched unit."""
+        if (unit := self.units.get(key)) is None:
+            unit = self.units[key] = FebosUnit()
+        return unit
+
+    def _apply_realtime(self, inst_id, response):
+        """Store the realtime values of an installation."""
+        start = time.perf_counter()
+        for entry in response:
+            device_id, thing_id = entry["deviceId"], entry["thingId"]
+            for code, value in entry["data"].items():
+                if not self._apply_value(
+                    inst_id, device_id, thing_id, code, value["i"]
+                ):
+                    LOGGER.debug(f"Unknown resource {code} of thing {thing_id}")
+        self.client.stats.record(
+            "parse_realtime_data", inst_id, time.perf_counter() - start
+        )
+
+    def _apply_slaves(self, inst_id, device_id, response):
+        """Store the values of the slaves of a device."""
+        start = time.perf_counter()
+        for slave in response:
+            slave_id = slave["indirizzoSlave"]
+            for code, value in slave.items():
+                self._apply_value(inst_id, device_id, slave_id, code, value)
+        self.client.stats.record(
+            "parse_get_febos_slave", inst_id, time.perf_counter() - start
+        )
+
+    @staticmethod
+    async def _async_background(coro):
+        """Await a request yielding to the interactive and polling ones."""
+        with priority(PRIORITY_BACKGROUND):
+            return await coro
+
+    @staticmethod
+    async def _async_prefetched(response):
+        """Return a response downloaded ahead of its update."""
+        return response
+
+    async def async_update(self, installation_ids=None):
+        """Download the values due for an update, isolating failed units."""
+        now = time.monotonic()
+        requests = []
+        backing_off = []
+        for inst_id, installation in self.data.items():
+            if installation_ids is not None and inst_id not in installation_ids:
+                continue
+            unit = self._unit(("realtime", inst_id))
+            slow_due = unit.slow_due(now, self.slow_interval)
+            if unit.backing_off(now):
+                backing_off.append(unit)
+            elif groups := self._due_groups(inst_id, slow_due):
+                requests.append(
+                    (
+                        unit,
+                        slow_due,
+                        self.client.async_realtime_data(inst_id, groups),
+                        partial(self._apply_realtime, inst_id),
+                    )
+                )
+            for device_id in installation["devices"]:
+                if (inst_id, device_id) not in self.polled_slaves:
+                    self.prefetched.pop((inst_id, device_id), None)
+                    continue
+                unit = self._unit(("slaves", inst_id, device_id))
+                slow_due = unit.slow_due(now, self.slow_interval)
+                if (
+                    response := self.prefetched.pop((inst_id, device_id), None)
+                ) is not None:
+                    # The slaves were just downloaded with the topology.
+                    requests.append(
+                        (
+                            unit,
+                            slow_due,
+                            self._async_prefetched(response),
+                            partial(self._apply_slaves, inst_id, device_id),
+                        )
+                    )
+                elif unit.backing_off(now):
+                    backing_off.append(unit)
+                elif slow_due or not self.slow_slaves:
+                    request = self.client.async_get_febos_slave(inst_id, device_id)
+                    if self.slow_slaves:
+                        request = self._async_background(request)
+                    requests.append(
+                        (
+                            unit,
+                            slow_due,
+                            request,
+                            partial(self._apply_slaves, inst_id, device_id),
+                        )
+                    )
+        if backing_off and not requests:
+            raise FebosError(
+                f"Every unit is waiting to be retried: {backing_off[0].error}"
+            )
+        responses = await asyncio.gather(
+            *(request for _, _, request, _ in requests),
+            return_exceptions=True,
+        )
+        for response in responses:
+            if isinstance(response, AuthenticationError) or (
+                isinstance(response, BaseException)
+                and not isinstance(response, Exception)
+            ):
+                raise response
+        # Updates of different installations may overlap; applying the
+        # responses does not yield, so each one gets its own changed set.
+        self.changed = set()
+        failures = []
+        for (unit, slow_due, _, apply), response in zip(
+            requests, responses, strict=True
+        ):
+            if not isinstance(response, Exception):
+                try:
+                    apply(response)
+                except PARSE_ERRORS as e:
+                    response = FebosParseError(f"Unexpected response: {e!r}")
+            if isinstance(response, Exception):
+                delay = unit.failure(now, response)
+                LOGGER.warning(f"Update failed, retrying in {delay:.0f}s: {response}")
+                failures.append(response)
+            else:
+                unit.success(now, slow_due)
+        if failures and len(failures) == len(requests):
+            raise failures[0]
+        LOGGER.debug("Data update")
+
+
+class FebosUnit:
+    """Failure and tier state of an independently fetched part of an account."""
+
+    __slots__ = ("error", "errors", "retry_at", "slow_updated", "updated_at")
+
+    def __init__(self) -> None:
+        """Initialize the unit state."""
+        self.error: str | None = None
+        self.errors = 0
+        self.retry_at: float | None = None
+        self.slow_updated: float | None = None
+        self.updated_at: float | None = None
+
+    def backing_off(self, now: float) -> bool:
+        """Return true if the unit must not be retried yet."""
+        return self.retry_at is not None and now < self.retry_at
+
+    def slow_due(self, now: float, interval: timedelta) -> bool:
+        """Return true if the slow tier of the unit is due for an update."""
+        return (
+            self.slow_updated is None
+            or now - self.slow_updated >= interval.total_seconds()
+        )
+
+    def success(self, now: float, slow_due: bool) -> None:
+        """Record a successful update."""
+        self.error = None
+        self.errors = 0
+        self.retry_at = None
+        self.updated_at = time.time()
+        if slow_due:
+            self.slow_updated = now
+
+    def failure(self, now: float, error: Exception) -> float:
+        """Record a failed update and return the delay before the next retry."""
+        self.error = str(error)
+        self.errors += 1
+        delay = min(
+            UNIT_RETRY_INTERVAL * 2 ** (self.errors - 1), MAX_BACKOFF_INTERVAL
+        ).total_seconds()
+        self.retry_at = now + delay
+        return delay
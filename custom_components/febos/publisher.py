@@ -0,0 +1,89 @@
+"""EmmeTI Febos deadband and rate limited publishing."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import math
+from typing import Any
+
+from .const import DEFAULT_DEADBANDS
+from .febos import FebosResource
+
+
+def parse_deadbands(text: str) -> dict[str, float]:
+    """Parse comma or newline separated device_class=deadband or code=deadband."""
+    deadbands = {}
+    for item in text.replace("\n", ",").split(","):
+        if not (item := item.strip()):
+            continue
+        key, separator, deadband = item.partition("=")
+        if not separator or not key.strip():
+            raise ValueError(f"Invalid deadband {item}")
+        deadbands[key.strip().lower()] = abs(float(deadband))
+    return deadbands
+
+
+class FebosPublisher:
+    """Filter the downloaded values before they are written as entity states."""
+
+    def __init__(
+        self,
+        deadbands: dict[str, float] | None = None,
+        min_interval: timedelta = timedelta(0),
+    ) -> None:
+        """Initialize the publisher."""
+        self.deadbands = {**DEFAULT_DEADBANDS, **(deadbands or {})}
+        self.min_interval = min_interval.total_seconds()
+        self.published: dict[str, Any] = {}
+        self.published_at: dict[str, float] = {}
+        self.pending: set[str] = set()
+        self.suppressed = 0
+
+    def deadband(self, resource: FebosResource) -> float:
+        """Return the smallest change of a resource worth publishing."""
+        if (deadband := self.deadbands.get(resource.id.lower())) is not None:
+            return deadband
+        return self.deadbands.get(str(resource.device_class), 0.0)
+
+    def _significant(self, resource: FebosResource, old: Any, new: Any) -> bool:
+        """Return true if a change exceeds the deadband of the resource."""
+        if (
+            old is None
+            or new is None
+            or isinstance(new, bool | str)
+            or isinstance(old, bool | str)
+        ):
+            return old != new
+        change, deadband = abs(new - old), self.deadband(resource)
+        # Decoded values are scaled floats: a change of exactly the deadband
+        # may come out one rounding error short of it.
+        return change >= deadband or math.isclose(change, deadband)
+
+    def publish(
+        self,
+        resources: dict[str, FebosResource],
+        values: dict[str, Any],
+        changed: set[str],
+        now: float,
+    ) -> set[str]:
+        """Publish the significant changes and return the published keys."""
+        published = set()
+        for key in changed | self.pending:
+            old, new = self.published.get(key), values.get(key)
+            if (resource := resources.get(key)) is not None and not self._significant(
+                resource, old, new
+            ):
+                self.pending.discard(key)
+                self.suppressed += key in changed
+                continue
+            if (
+                old is not None
+                and now - self.published_at.get(key, now) < self.min_interval
+            ):
+                self.pending.add(key)
+                continue
+            self.pending.discard(key)
+            self.published[key] = new
+            self.published_at[key] = now
+            published.add(key)
+        return published
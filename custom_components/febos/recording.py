@@ -0,0 +1,207 @@
+"""EmmeTI Febos API traffic recording and replay."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+import gzip
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Any, BinaryIO
+
+from febos.errors import FebosError
+
+from .const import LOGGER, RECORDING_BACKUPS, RECORDING_MAX_BYTES
+
+RECORDED_ENDPOINTS = frozenset({"page_config", "realtime_data", "get_febos_slave"})
+
+
+def recorded_args(args: tuple[Any, ...]) -> list[Any]:
+    """Return the arguments of a call in a JSON serializable form."""
+    return [
+        sorted(arg) if isinstance(arg, set | frozenset | list) else arg for arg in args
+    ]
+
+
+def replay_key(endpoint: str, args: list[Any]) -> tuple[Any, ...]:
+    """Return the key matching a replayed call to its recorded responses."""
+    if endpoint == "realtime_data":
+        # The polled groups depend on the polling tiers, not on the plant.
+        return (endpoint, args[0])
+    return (endpoint, *args)
+
+
+class FebosRecorder:
+    """Stream the raw API responses to rotated, gzip compressed JSONL files."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = RECORDING_MAX_BYTES,
+        backups: int = RECORDING_BACKUPS,
+    ) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._topology: dict[int, str] = {}
+        self._raw: BinaryIO | None = None
+        self._file: gzip.GzipFile | None = None
+        self._closed = False
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking API call and record its response."""
+        start = time.perf_counter()
+        response = func(*args)
+        if func.__name__ in RECORDED_ENDPOINTS:
+            self.write(
+                {
+                    "time": time.time(),
+                    "endpoint": func.__name__,
+                    "args": recorded_args(args),
+                    "latency": time.perf_counter() - start,
+                    "response": response,
+                }
+            )
+        return response
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Append a record, rotating the file once it exceeds the size limit."""
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._raw = self.path.open("ab")
+                self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+                # Every file starts with the topology, so it replays on its own.
+                for topology_line in self._topology.values():
+                    if topology_line != line:
+                        self._file.write(topology_line.encode())
+            if record["endpoint"] == "page_config":
+                self._topology[record["args"][0]] = line
+            self._file.write(line.encode())
+            self._file.flush()
+            if self._raw.tell() >= self.max_bytes:
+                self._close()
+                self._rotate()
+
+    def _rotate(self) -> None:
+        """Shift the rotated files, dropping the oldest."""
+        for n in range(self.backups, 1, -1):
+            source = self.path.with_name(f"{self.path.name}.{n - 1}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{n}"))
+        if self.backups:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def _close(self) -> None:
+        """Close the current file."""
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = self._raw = None
+
+    def close(self) -> None:
+        """Stop recording."""
+        with self._lock:
+            self._closed = True
+            self._close()
+
+
+def recording_files(path: Path) -> list[Path]:
+    """Return a recording and its rotated files, oldest first."""
+    rotated = sorted(
+        path.parent.glob(f"{path.name}.*"),
+        key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0,
+        reverse=True,
+    )
+    return [p for p in [*rotated, path] if p.exists()]
+
+
+def read_records(paths: list[Path]) -> Iterator[dict[str, Any]]:
+    """Stream the records of one or more recording files."""
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    # A partial last line has no newline yet.
+                    if line.endswith("\n") and line.strip():
+                        yield json.loads(line)
+            except (EOFError, gzip.BadGzipFile):
+                # A recording that was not closed ends with a truncated member.
+                LOGGER.warning(f"{path} ends with a truncated record")
+
+
+class FebosReplayApi:
+    """Serve recorded responses in place of the EmmeTI Febos webapp."""
+
+    def __init__(self, records: Iterator[dict[str, Any]]) -> None:
+        """Index the recorded responses by call."""
+        self.responses: dict[tuple[Any, ...], list[dict[str, Any]]] = {}
+        for record in records:
+            key = replay_key(record["endpoint"], record["args"])
+            self.responses.setdefault(key, []).append(record)
+        self.positions = dict.fromkeys(self.responses, 0)
+        self.login_data: dict[str, Any] = {}
+        self.time: float | None = None
+
+    def login(self) -> None:
+        """Log in with the installations found in the recording."""
+        self.login_data = {
+            "installationIdList": sorted(
+                {key[1] for key in self.responses if key[0] == "page_config"}
+            )
+        }
+
+    def _response(self, endpoint: str, *args: Any) -> Any:
+        """Return the next recorded response of a call."""
+        key = replay_key(endpoint, recorded_args(args))
+        if (records := self.responses.get(key)) is None:
+            raise FebosError(f"No recorded response for {key}")
+        position = self.positions[key]
+        self.positions[key] = min(position + 1, len(records))
+        record = records[min(position, len(records) - 1)]
+        self.time = record["time"]
+        return record["response"]
+
+    @property
+    def exhausted(self) -> bool:
+        """Return true once every recorded update has been replayed."""
+        return all(
+            self.positions[key] >= len(records)
+            for key, records in self.responses.items()
+            if key[0] != "page_config"
+        )
+
+    def next_delay(self) -> float:
+        """Return the recorded time between the last and the next update."""
+        upcoming = [
+            records[self.positions[key]]["time"]
+            for key, records in self.responses.items()
+            if key[0] != "page_config" and self.positions[key] < len(records)
+        ]
+        if self.time is None or not upcoming:
+            return 0.0
+        return max(min(upcoming) - self.time, 0.0)
+
+    def page_config(self, installation_id: int) -> dict[str, Any]:
+        """Return the recorded page configuration of an installation."""
+        return self._response("page_config", installation_id)
+
+    def realtime_data(
+        self, installation_id: int, groups: set[str]
+    ) -> list[dict[str, Any]]:
+        """Return the next recorded realtime values of an installation."""
+        return self._response("realtime_data", installation_id, groups)
+
+    def get_febos_slave(
+        self, installation_id: int, device_id: int
+    ) -> list[dict[str, Any]]:
+        """Return the next recorded slaves of a device."""
+        return self._response("get_febos_slave", installation_id, device_id)
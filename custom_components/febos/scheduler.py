@@ -0,0 +1,52 @@
+"""EmmeTI Febos adaptive polling scheduler."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from .const import (
+    ACTIVE_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+    IDLE_UPDATE_CYCLES,
+    IDLE_UPDATE_INTERVAL,
+    MAX_BACKOFF_INTERVAL,
+)
+
+
+class FebosScheduler:
+    """Choose the next polling interval from the state of the plant."""
+
+    def __init__(
+        self,
+        interval: timedelta = DEFAULT_UPDATE_INTERVAL,
+        active_interval: timedelta = ACTIVE_UPDATE_INTERVAL,
+        idle_interval: timedelta = IDLE_UPDATE_INTERVAL,
+        idle_cycles: int = IDLE_UPDATE_CYCLES,
+        max_backoff: timedelta = MAX_BACKOFF_INTERVAL,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.interval = interval
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.idle_cycles = idle_cycles
+        self.max_backoff = max_backoff
+        self.stable_cycles = 0
+        self.errors = 0
+
+    def success(self, active: bool, changed: bool) -> timedelta:
+        """Return the interval following a successful update."""
+        self.errors = 0
+        if active or changed:
+            self.stable_cycles = 0
+        else:
+            self.stable_cycles += 1
+        if active:
+            return self.active_interval
+        if self.stable_cycles >= self.idle_cycles:
+            return self.idle_interval
+        return self.interval
+
+    def failure(self) -> timedelta:
+        """Return the interval following a failed update."""
+        self.errors += 1
+        return min(self.interval * 2**self.errors, self.max_backoff)
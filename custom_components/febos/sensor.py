@@ -4,58 +4,152 @@ from __future__ import annotations
 
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
-from homeassistant.core import HomeAssistant
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    Platform,
+    UnitOfEnergy,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
-from .coordinator import FebosConfigEntry, FebosDataUpdateCoordinator
+from .buffer import DERIVED_DUTY_CYCLE, DERIVED_ENERGY, DERIVED_MEAN, derived_key
+from .const import DERIVED_KEY, DOMAIN, STATS_ENDPOINTS, STATS_KEY
+from .coordinator import (
+    FebosConfigEntry,
+    FebosDataUpdateCoordinator,
+    FebosEntityEntry,
+)
+from .entity import FebosEntity, device_info
+from .febos import FebosResource
+from .stats import latency_unique_id
 
 
 class FebosSensorEntityDescription(SensorEntityDescription):
     """Describes an EmmeTI Febos sensor entity description."""
 
 
-class FebosSensorEntity(CoordinatorEntity[FebosDataUpdateCoordinator], SensorEntity):
+class FebosSensorEntity(FebosEntity, SensorEntity):
     """Defines an EmmeTI Febos sensor."""
 
+    @property
+    def native_value(self) -> str | None:
+        """Return the value of the sensor."""
+        return self.value
+
+
+class FebosLatencySensorEntity(
+    CoordinatorEntity[FebosDataUpdateCoordinator], SensorEntity
+):
+    """Defines an EmmeTI Febos API latency diagnostic sensor."""
+
     _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, coordinator: FebosDataUpdateCoordinator, endpoint: str) -> None:
+        """Initialize EmmeTI Febos latency sensor."""
+        super().__init__(coordinator)
+        entry = coordinator.config_entry
+        self.endpoint = endpoint
+        self._attr_unique_id = latency_unique_id(entry.entry_id, endpoint)
+        self._attr_name = f"{endpoint.replace('_', ' ').capitalize()} latency"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            entry_type=DeviceEntryType.SERVICE,
+            manufacturer="EmmeTI",
+            name=entry.title,
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the rolling mean latency of the endpoint."""
+        mean = self.coordinator.client.stats.summary(self.endpoint)["mean"]
+        return None if mean is None else mean * 1000
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the call, error and payload counters of the endpoint."""
+        summary = self.coordinator.client.stats.summary(self.endpoint)
+        return {
+            "calls": summary["calls"],
+            "errors": summary["errors"],
+            "bytes": summary["bytes"],
+            "p95": None if summary["p95"] is None else summary["p95"] * 1000,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state after every update."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_key_listener(
+                STATS_KEY, self._handle_coordinator_update
+            )
+        )
+
+
+class FebosDerivedSensorEntity(
+    CoordinatorEntity[FebosDataUpdateCoordinator], SensorEntity
+):
+    """Defines a metric derived from the recent values of a resource."""
+
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
 
     def __init__(
         self,
         coordinator: FebosDataUpdateCoordinator,
-        description: FebosSensorEntityDescription,
         device: dict[str, Any],
         thing: dict[str, Any],
-        resource: dict[str, Any],
+        resource: FebosResource,
+        kind: str,
     ) -> None:
-        """Initialize EmmeTI Febos sensor."""
+        """Initialize EmmeTI Febos derived sensor."""
         super().__init__(coordinator)
-        self.entity_description = description
-        self._attr_unique_id = description.key
-        self._attr_name = resource["name"]
-        self._attr_device_info = DeviceInfo(
-            identifiers={
-                (
-                    DOMAIN,
-                    device["installation_id"],
-                    device["id"],
-                    thing["id"],
-                )
-            },
-            entry_type=DeviceEntryType.SERVICE,
-            manufacturer=device["manufacturer"],
-            model=device["model"],
-            name=thing["name"],
-        )
-        self.value_fn = resource["value_fn"]
+        self.key = derived_key(resource.key, kind)
+        self._attr_unique_id = self.key
+        self._attr_device_info = device_info(device, thing)
+        if kind == DERIVED_MEAN:
+            self._attr_name = f"{resource.name} mean"
+            self._attr_device_class = resource.device_class
+            self._attr_native_unit_of_measurement = resource.unit
+            self._attr_entity_registry_enabled_default = False
+        elif kind == DERIVED_DUTY_CYCLE:
+            self._attr_name = f"{resource.name} duty cycle"
+            self._attr_native_unit_of_measurement = PERCENTAGE
+        elif kind == DERIVED_ENERGY:
+            self._attr_name = f"{resource.name} energy last hour"
+            self._attr_device_class = SensorDeviceClass.ENERGY
+            self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+            self._attr_state_class = None
 
     @property
-    def native_value(self) -> str | None:
-        """Return the value of the sensor."""
-        return self.value_fn()
+    def native_value(self) -> float | None:
+        """Return the metric over the recent values."""
+        return self.coordinator.derived.get(self.key)
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state after every update."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_key_listener(
+                DERIVED_KEY, self._handle_coordinator_update
+            )
+        )
 
 
 async def async_setup_entry(
@@ -64,18 +158,36 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up a config entry."""
-    async_add_entities(
-        FebosSensorEntity(
-            coordinator=entry.runtime_data,
-            description=FebosSensorEntityDescription(
-                key=resource["key"],
-                native_unit_of_measurement=resource["unit"],
-                device_class=resource["class"],
-                state_class=resource["state"],
-            ),
-            device=device,
-            thing=thing,
-            resource=resource,
+
+    @callback
+    def add_sensors(entries: list[FebosEntityEntry]) -> None:
+        async_add_entities(
+            FebosSensorEntity(
+                coordinator=entry.runtime_data,
+                description=FebosSensorEntityDescription(
+                    key=resource.key,
+                    native_unit_of_measurement=resource.unit,
+                    device_class=resource.device_class,
+                    state_class=resource.state_class,
+                ),
+                device=device,
+                thing=thing,
+                resource=resource,
+            )
+            for device, thing, resource in entries
+        )
+
+    entry.runtime_data.async_add_entity_callback(Platform.SENSOR, add_sensors)
+
+    @callback
+    def add_derived_sensors(entries: list[tuple[Any, Any, FebosResource, str]]) -> None:
+        async_add_entities(
+            FebosDerivedSensorEntity(entry.runtime_data, device, thing, resource, kind)
+            for device, thing, resource, kind in entries
         )
-        for device, thing, resource in entry.runtime_data.get_sensors()
+
+    entry.runtime_data.async_add_derived_callback(add_derived_sensors)
+    async_add_entities(
+        FebosLatencySensorEntity(entry.runtime_data, endpoint)
+        for endpoint in STATS_ENDPOINTS
     )
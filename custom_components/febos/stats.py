@@ -0,0 +1,110 @@
+"""EmmeTI Febos API instrumentation."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+import json
+from statistics import fmean
+from typing import Any
+
+from .const import DOMAIN, STATS_WINDOW
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+def payload_size(response: Any) -> int:
+    """Return the size of a decoded response once serialized as compact JSON."""
+    return len(json.dumps(response, separators=(",", ":"), ensure_ascii=False))
+
+
+def latency_unique_id(entry_id: str, endpoint: str) -> str:
+    """Return the unique id of the latency sensor of an endpoint."""
+    return f"{DOMAIN}_{entry_id}_{endpoint}_latency"
+
+
+class EndpointStats:
+    """Counters and a rolling latency window for one endpoint."""
+
+    __slots__ = ("bytes", "calls", "errors", "latencies")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latencies: deque[float] = deque(maxlen=STATS_WINDOW)
+
+    def record(self, latency: float, size: int = 0, error: bool = False) -> None:
+        """Record a call."""
+        self.calls += 1
+        self.errors += error
+        self.bytes += size
+        self.latencies.append(latency)
+
+
+def summarize(stats: list[EndpointStats]) -> dict[str, Any]:
+    """Summarize the counters and latency windows of one or more endpoints."""
+    latencies = sorted(latency for s in stats for latency in s.latencies)
+    histogram = [0] * len(LATENCY_BUCKETS)
+    for latency in latencies:
+        histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+    summary = {
+        "calls": sum(s.calls for s in stats),
+        "errors": sum(s.errors for s in stats),
+        "bytes": sum(s.bytes for s in stats),
+        "mean": None,
+        "p50": None,
+        "p95": None,
+        "max": None,
+        "histogram": {
+            f"le_{bucket}": count
+            for bucket, count in zip(LATENCY_BUCKETS, histogram, strict=True)
+        },
+    }
+    if latencies:
+        summary["mean"] = fmean(latencies)
+        summary["p50"] = latencies[len(latencies) // 2]
+        summary["p95"] = latencies[int(len(latencies) * 0.95)]
+        summary["max"] = latencies[-1]
+    return summary
+
+
+class FebosStats:
+    """Per endpoint and installation statistics of the EmmeTI Febos API."""
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.endpoints: dict[str, dict[int | None, EndpointStats]] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        installation_id: int | None,
+        latency: float,
+        size: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Record a call or a parsing step."""
+        installations = self.endpoints.setdefault(endpoint, {})
+        if installation_id not in installations:
+            installations[installation_id] = EndpointStats()
+        installations[installation_id].record(latency, size, error)
+
+    def summary(self, endpoint: str) -> dict[str, Any]:
+        """Summarize an endpoint over every installation."""
+        return summarize(list(self.endpoints.get(endpoint, {}).values()))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics of every endpoint and installation."""
+        return {
+            endpoint: {
+                "total": summarize(list(installations.values())),
+                "installations": {
+                    str(installation_id): summarize([stats])
+                    for installation_id, stats in installations.items()
+                    if installation_id is not None
+                },
+            }
+            for endpoint, installations in self.endpoints.items()
+        }
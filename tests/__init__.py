@@ -0,0 +1 @@
+"""Tests for the EmmeTI Febos integration."""
@@ -0,0 +1,144 @@
+"""Tests for the EmmeTI Febos sample buffer."""
+
+from types import SimpleNamespace
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import Platform, UnitOfPower, UnitOfTemperature
+import pytest
+
+from custom_components.febos.buffer import (
+    DERIVED_DUTY_CYCLE,
+    DERIVED_ENERGY,
+    DERIVED_MEAN,
+    FebosSampleBuffer,
+    derived_key,
+)
+from custom_components.febos.febos import FebosResource
+
+DEVICE = {"id": 1, "installation_id": 1}
+THING = {"id": 1}
+PUMP = FebosResource(
+    id="R8681",
+    key="pump",
+    name="Pump",
+    platform=Platform.BINARY_SENSOR,
+    device_class=BinarySensorDeviceClass.RUNNING,
+)
+POWER = FebosResource(
+    id="R8684",
+    key="power",
+    name="Power",
+    platform=Platform.SENSOR,
+    device_class=SensorDeviceClass.POWER,
+    unit=UnitOfPower.KILO_WATT,
+)
+TEMPERATURE = FebosResource(
+    id="R8702",
+    key="temperature",
+    name="Temperature",
+    platform=Platform.SENSOR,
+    device_class=SensorDeviceClass.TEMPERATURE,
+    unit=UnitOfTemperature.CELSIUS,
+)
+
+
+def buffer(size: int = 240) -> FebosSampleBuffer:
+    """Return a buffer of a pump, a power meter and a thermometer."""
+    index = SimpleNamespace(
+        entries={
+            resource.key: (DEVICE, THING, resource)
+            for resource in (PUMP, POWER, TEMPERATURE)
+        }
+    )
+    return FebosSampleBuffer(index, size)
+
+
+def test_duty_cycle_is_weighted_by_time():
+    """Frequent samples while running do not outweigh sparse idle ones."""
+    samples = buffer()
+    # 30 minutes running polled every 30 s, then 30 minutes idle every 5 min.
+    for t in range(0, 1800, 30):
+        samples.append(t, {"pump": True})
+    for t in range(1800, 3600, 300):
+        samples.append(t, {"pump": False})
+    derived = samples.derived(3600)
+    assert derived[derived_key("pump", DERIVED_DUTY_CYCLE)] == pytest.approx(50.0)
+
+
+def test_mean_is_weighted_by_time():
+    """Each value counts for the time it held."""
+    samples = buffer()
+    samples.append(0, {"temperature": 20.0})
+    samples.append(2700, {"temperature": 24.0})
+    samples.append(2730, {"temperature": 24.0})
+    derived = samples.derived(3600)
+    assert derived[derived_key("temperature", DERIVED_MEAN)] == pytest.approx(21.0)
+
+
+def test_mean_of_a_single_sample():
+    """A sample taken just now is its own mean."""
+    samples = buffer()
+    samples.append(0, {"temperature": 20.0})
+    derived = samples.derived(0)
+    assert derived[derived_key("temperature", DERIVED_MEAN)] == 20.0
+
+
+def test_energy_of_a_constant_load():
+    """A constant 1 kW load over the last hour used 1 kWh."""
+    samples = buffer()
+    for t in range(0, 3601, 60):
+        samples.append(t, {"power": 1.0})
+    derived = samples.derived(3600)
+    assert derived[derived_key("power", DERIVED_ENERGY)] == pytest.approx(1.0)
+
+
+def test_samples_outside_the_window_are_ignored():
+    """Only the samples of the last hour are derived from."""
+    samples = buffer()
+    samples.append(0, {"temperature": 10.0, "pump": True})
+    samples.append(3700, {"temperature": 20.0, "pump": False})
+    samples.append(4000, {"temperature": 20.0, "pump": False})
+    derived = samples.derived(4000)
+    assert derived[derived_key("temperature", DERIVED_MEAN)] == 20.0
+    assert derived[derived_key("pump", DERIVED_DUTY_CYCLE)] == 0.0
+
+
+def test_missing_values_are_unknown():
+    """Resources without numeric samples have no derived metrics."""
+    samples = buffer()
+    samples.append(0, {"temperature": "---"})
+    samples.append(60, {})
+    derived = samples.derived(60)
+    assert derived[derived_key("temperature", DERIVED_MEAN)] is None
+    assert derived[derived_key("pump", DERIVED_DUTY_CYCLE)] is None
+    assert derived[derived_key("power", DERIVED_ENERGY)] is None
+
+
+def test_ring_overwrites_the_oldest_samples():
+    """A full buffer keeps only the most recent samples."""
+    samples = buffer(size=4)
+    for t, value in enumerate([10.0, 10.0, 20.0, 20.0, 20.0, 20.0]):
+        samples.append(t, {"temperature": value})
+    derived = samples.derived(5)
+    assert derived[derived_key("temperature", DERIVED_MEAN)] == 20.0
+
+
+def test_buffer_of_one_installation():
+    """A buffer restricted to an installation skips the other ones."""
+    other = FebosResource(
+        id="R8684",
+        key="other_power",
+        name="Power",
+        platform=Platform.SENSOR,
+        device_class=SensorDeviceClass.POWER,
+        unit=UnitOfPower.KILO_WATT,
+    )
+    index = SimpleNamespace(
+        entries={
+            POWER.key: (DEVICE, THING, POWER),
+            other.key: ({"id": 2, "installation_id": 2}, THING, other),
+        }
+    )
+    samples = FebosSampleBuffer(index, installation_id=1)
+    assert samples.keys == [POWER.key]
@@ -0,0 +1,136 @@
+"""Tests for the EmmeTI Febos poller."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from febos.errors import FebosError
+import pytest
+
+from benchmarks.fake_febos import FakeFebosApi
+from custom_components.febos import poller as poller_module
+from custom_components.febos.client import FebosClient
+from custom_components.febos.const import UNIT_RETRY_INTERVAL
+from custom_components.febos.poller import FebosPoller
+
+FIRST, SECOND = FakeFebosApi.installation_id(0), FakeFebosApi.installation_id(1)
+RETRY = UNIT_RETRY_INTERVAL.total_seconds()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock of the poller with a settable one."""
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(
+        poller_module,
+        "time",
+        SimpleNamespace(
+            monotonic=lambda: clock.now,
+            perf_counter=time.perf_counter,
+            time=time.time,
+        ),
+    )
+    return clock
+
+
+def fail(api, name, installation_id=None):
+    """Make an API call raise, for one installation or for all of them."""
+    func = getattr(api, name)
+
+    def call(inst_id, *args):
+        if installation_id is None or inst_id == installation_id:
+            api.failed += 1
+            raise FebosError(f"{name} of {inst_id} failed")
+        return func(inst_id, *args)
+
+    call.__name__ = name
+    setattr(api, name, call)
+    return func
+
+
+async def async_poller(api):
+    """Return a poller of the installations of the API with its first values."""
+    client = FebosClient(api)
+    await client.async_login()
+    poller = FebosPoller(client)
+    poller.set_topology(await poller.async_fetch_topology())
+    await poller.async_update()
+    api.failed = 0
+    return poller
+
+
+def test_failed_unit_does_not_fail_update(clock):
+    """Test that the other installations are updated when one fails."""
+
+    async def run():
+        api = FakeFebosApi(installations=2)
+        poller = await async_poller(api)
+        fail(api, "realtime_data", FIRST)
+        await poller.async_update()
+        return poller
+
+    poller = asyncio.run(run())
+    failed = poller.units[("realtime", FIRST)]
+    assert failed.errors == 1
+    assert failed.retry_at == RETRY
+    assert poller.units[("realtime", SECOND)].errors == 0
+    assert poller.units[("realtime", SECOND)].updated_at is not None
+
+
+def test_backoff_grows_and_resets(clock):
+    """Test that a failing unit waits longer each time until it succeeds."""
+
+    async def run():
+        api = FakeFebosApi(installations=2)
+        poller = await async_poller(api)
+        unit = poller.units[("realtime", FIRST)]
+        realtime_data = fail(api, "realtime_data", FIRST)
+        retries = []
+        for _ in range(3):
+            await poller.async_update()
+            retries.append(unit.retry_at - clock.now)
+            clock.now = unit.retry_at
+        api.realtime_data = realtime_data
+        await poller.async_update()
+        return unit, retries
+
+    unit, retries = asyncio.run(run())
+    assert retries == [RETRY, 2 * RETRY, 4 * RETRY]
+    assert unit.errors == 0
+    assert unit.error is None
+    assert unit.retry_at is None
+
+
+def test_unit_is_not_retried_while_backing_off(clock):
+    """Test that a failed unit is skipped until its retry time."""
+
+    async def run():
+        api = FakeFebosApi(installations=2)
+        poller = await async_poller(api)
+        fail(api, "realtime_data", FIRST)
+        await poller.async_update()
+        failed = api.failed
+        clock.now = RETRY / 2
+        await poller.async_update()
+        return api.failed - failed
+
+    assert asyncio.run(run()) == 0
+
+
+def test_all_units_backing_off_fails_update(clock):
+    """Test that an update polling no unit because all back off fails."""
+
+    async def run():
+        api = FakeFebosApi()
+        poller = await async_poller(api)
+        fail(api, "realtime_data")
+        fail(api, "get_febos_slave")
+        with pytest.raises(FebosError):
+            await poller.async_update()
+        failed = api.failed
+        clock.now = RETRY / 2
+        with pytest.raises(FebosError):
+            await poller.async_update()
+        return api.failed - failed
+
+    assert asyncio.run(run()) == 0
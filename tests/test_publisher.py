@@ -0,0 +1,95 @@
+"""Tests for the EmmeTI Febos publisher."""
+
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import Platform
+import pytest
+
+from custom_components.febos.febos import FebosResource, value_decoder
+from custom_components.febos.publisher import FebosPublisher, parse_deadbands
+
+
+def resource(code: str, device_class: SensorDeviceClass) -> FebosResource:
+    """Return a sensor resource decoded like the register of a code."""
+    return FebosResource(
+        id=code,
+        key=code.lower(),
+        name=code,
+        platform=Platform.SENSOR,
+        device_class=device_class,
+        decode=value_decoder(code),
+    )
+
+
+def publish(publisher, sensor, raw_values, now=0.0):
+    """Publish the decoded raw values of a sensor one after the other."""
+    published = []
+    for step, raw in enumerate(raw_values):
+        value = sensor.decode(raw)
+        keys = publisher.publish(
+            {sensor.key: sensor}, {sensor.key: value}, {sensor.key}, now + step
+        )
+        published.append(sensor.key in keys)
+    return published
+
+
+@pytest.mark.parametrize(
+    ("code", "device_class", "raw_values"),
+    [
+        # 20.2 - 20.0 == 0.19999999999999929 against the 0.2 default deadband.
+        ("R8702", SensorDeviceClass.TEMPERATURE, [200, 202]),
+        # 0.11 - 0.10 == 0.009999999999999995 against the 0.01 default deadband.
+        ("R8684", SensorDeviceClass.POWER, [10, 11]),
+    ],
+)
+def test_change_of_exactly_the_deadband_is_published(code, device_class, raw_values):
+    """A change equal to the deadband is published despite rounding errors."""
+    assert publish(FebosPublisher(), resource(code, device_class), raw_values) == [
+        True,
+        True,
+    ]
+
+
+def test_change_within_the_deadband_is_suppressed():
+    """A change smaller than the deadband is not published."""
+    publisher = FebosPublisher()
+    sensor = resource("R8702", SensorDeviceClass.TEMPERATURE)
+    assert publish(publisher, sensor, [200, 201, 202]) == [True, False, True]
+    assert publisher.published[sensor.key] == 20.2
+    assert publisher.suppressed == 1
+
+
+def test_configured_deadband_overrides_the_default():
+    """A deadband configured by code takes precedence over the device class."""
+    publisher = FebosPublisher(parse_deadbands("r8702=0.5"))
+    sensor = resource("R8702", SensorDeviceClass.TEMPERATURE)
+    assert publish(publisher, sensor, [200, 204, 205]) == [True, False, True]
+
+
+def test_min_interval_defers_the_change():
+    """A change within the minimum interval is published once it elapses."""
+    publisher = FebosPublisher(min_interval=timedelta(seconds=10))
+    sensor = resource("R8702", SensorDeviceClass.TEMPERATURE)
+    resources, values = {sensor.key: sensor}, {sensor.key: 20.0}
+    assert publisher.publish(resources, values, {sensor.key}, 0) == {sensor.key}
+    values[sensor.key] = 21.0
+    assert publisher.publish(resources, values, {sensor.key}, 5) == set()
+    assert publisher.pending == {sensor.key}
+    assert publisher.publish(resources, values, set(), 10) == {sensor.key}
+    assert publisher.published[sensor.key] == 21.0
+
+
+@pytest.mark.parametrize("text", ["temperature", "=1", "power=x"])
+def test_parse_deadbands_rejects_invalid_items(text):
+    """Invalid deadbands raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_deadbands(text)
+
+
+def test_parse_deadbands():
+    """Deadbands are separated by commas or new lines and keyed in lower case."""
+    assert parse_deadbands("Temperature=0.5,\nR8702 = -1\n") == {
+        "temperature": 0.5,
+        "r8702": 1.0,
+    }